@@ -0,0 +1,199 @@
+"""Offline bulk scoring of the processed student CSV against every module.
+
+    python -m app.bulk_score --output data/processed/scores --format parquet --workers 8
+    python -m app.bulk_score --output data/processed/scores --resume
+
+Rows are read in chunks of ``--chunk-size`` students and scored in a process
+pool with :meth:`ApiBridge.score_arrays`, the same scoring as
+``ApiBridge.get_prediction`` (values are identical, field for field). Each
+chunk is written as its own part file (``part-000042.csv`` / ``.parquet``),
+published atomically, and recorded in ``manifest.json``; ``--resume`` skips
+the chunks already recorded. At most ``2 x workers`` chunks are in flight, so
+memory does not grow with the input size.
+
+CSV parts carry the header only in part 0, so ``cat part-*.csv`` is one valid
+CSV. Parquet output needs ``pyarrow`` and is read with
+``pandas.read_parquet(output_dir)``.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .libs.api_bridge import DEFAULT_STUDENTS_FILE, ApiBridge
+from .libs.columnar_cache import cache_key
+
+MANIFEST = "manifest.json"
+ID_COLUMN = "id_student"
+OUTPUT_COLUMNS = ["student_id", "module_code", "success_proba", "risk_level", "message"]
+
+# One bridge per worker process, created by the pool initializer
+_bridge: Optional[ApiBridge] = None
+
+
+def _init_worker(students_file: str):
+    global _bridge
+    with contextlib.redirect_stdout(io.StringIO()):
+        _bridge = ApiBridge(students_file)
+        # Every chunk must be scored by the same model: wait for the background load
+        _bridge.models.wait_idle()
+
+
+def score_chunk(student_ids: np.ndarray, modules: List[str], bridge: ApiBridge):
+    """DataFrame of predictions for every (student, module), students varying slowest."""
+    import pandas as pd
+
+    student_ids = np.asarray(student_ids, dtype=np.int64)
+    probas = np.empty((len(student_ids), len(modules)), dtype=np.float64)
+    message = None
+    for j, module_code in enumerate(modules):
+        probas[:, j], message = bridge.score_arrays(student_ids, module_code)
+    success_proba, risk = bridge.format_arrays(probas.ravel())
+    ids = np.repeat(student_ids, len(modules))
+    codes = np.tile(np.array(modules, dtype=object), len(student_ids))
+    return pd.DataFrame({
+        "student_id": ids,
+        "module_code": codes,
+        "success_proba": success_proba,
+        "risk_level": risk,
+        "message": message,
+    }, columns=OUTPUT_COLUMNS)
+
+
+def _write_part(index: int, student_ids: np.ndarray, modules: List[str], output_dir: str, fmt: str) -> int:
+    """Score one chunk and publish its part file; returns the number of output rows."""
+    frame = score_chunk(student_ids, modules, _bridge)
+    path = os.path.join(output_dir, f"part-{index:06d}.{fmt}")
+    tmp = path + ".tmp"
+    if fmt == "parquet":
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False, header=index == 0)
+    os.replace(tmp, path)
+    return len(frame)
+
+
+def count_rows(csv_path: str) -> int:
+    """Data rows in a CSV (newline count minus the header), without parsing it."""
+    lines = 0
+    last = b"\n"
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return lines + (last != b"\n") - 1
+
+
+def _load_manifest(output_dir: str) -> Optional[Dict]:
+    path = os.path.join(output_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(output_dir: str, manifest: Dict):
+    path = os.path.join(output_dir, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def run(input_path: str, output_dir: str, modules: List[str], fmt: str = "csv", chunk_size: int = 50_000,
+        workers: int = 1, resume: bool = False, progress=sys.stderr) -> Dict:
+    """Score ``input_path`` into part files under ``output_dir``; returns the manifest."""
+    import pandas as pd
+
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow), or use --format csv")
+
+    os.makedirs(output_dir, exist_ok=True)
+    params = {"input": os.path.abspath(input_path), "source_version": cache_key(input_path),
+              "modules": modules, "format": fmt, "chunk_size": chunk_size}
+    manifest = _load_manifest(output_dir)
+    if manifest is not None and not resume:
+        raise SystemExit(f"{output_dir} already holds a run; pass --resume to continue it or pick another directory")
+    if manifest is not None and {key: manifest.get(key) for key in params} != params:
+        raise SystemExit("Cannot resume: input file, modules, format or chunk size differ from the recorded run")
+    if manifest is None:
+        manifest = dict(params, completed={}, finished=False)
+    completed = manifest["completed"]
+
+    total_rows = count_rows(input_path)
+    n_chunks = -(-total_rows // chunk_size)
+    done_students = sum(completed.values()) // len(modules)
+    start = time.perf_counter()
+    scored_students = 0
+
+    def report():
+        elapsed = time.perf_counter() - start
+        rate = scored_students / elapsed if elapsed else 0.0
+        remaining = total_rows - done_students
+        eta = f"{remaining / rate:,.0f} s" if rate else "?"
+        print(f"[{len(completed)}/{n_chunks} chunks] {done_students:,}/{total_rows:,} students "
+              f"({rate:,.0f} students/s, ETA {eta})", file=progress, flush=True)
+
+    pending = {}
+
+    def drain(max_pending: int):
+        nonlocal done_students, scored_students
+        while len(pending) > max_pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index, n_students = pending.pop(future)
+                completed[str(index)] = future.result()
+                done_students += n_students
+                scored_students += n_students
+            # Recorded only once the part file is published, so a resume never skips lost work
+            _save_manifest(output_dir, manifest)
+            report()
+
+    reader = pd.read_csv(input_path, usecols=[ID_COLUMN], chunksize=chunk_size, dtype={ID_COLUMN: np.int64})
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(input_path,)) as pool:
+        for index, chunk in enumerate(reader):
+            if str(index) in completed:
+                continue
+            ids = chunk[ID_COLUMN].to_numpy()
+            pending[pool.submit(_write_part, index, ids, modules, output_dir, fmt)] = (index, len(ids))
+            # Bounded in-flight work keeps memory constant
+            drain(2 * workers - 1)
+        drain(0)
+
+    manifest["finished"] = True
+    manifest["rows"] = sum(completed.values())
+    _save_manifest(output_dir, manifest)
+    return manifest
+
+
+def main(argv=None):
+    from .data_service import DataService
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=DEFAULT_STUDENTS_FILE, help="processed student CSV")
+    parser.add_argument("--output", required=True, help="directory for part files and manifest.json")
+    parser.add_argument("--modules", nargs="+", help="module codes (default: every module of the catalog)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="students per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--resume", action="store_true", help="continue a previous run in --output")
+    args = parser.parse_args(argv)
+
+    modules = args.modules or list(DataService.get_all_modules())
+    start = time.perf_counter()
+    manifest = run(args.input, args.output, modules, args.format, args.chunk_size, args.workers, args.resume)
+    print(f"✅ {manifest['rows']:,} predictions in {len(manifest['completed'])} parts "
+          f"({time.perf_counter() - start:.1f} s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Chunked, streaming risk scoring of student × module cohorts.
+
+Pairs are enumerated student-major: position ``p`` is student ``p // M`` and
+module ``p % M`` for ``M`` modules. Students are taken in store row order,
+which only grows by appending, so a position stays a valid resume cursor
+while new students are added.
+"""
+import json
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from .scoring import heuristic_proba_batch, risk_levels, round2
+from .student_store import StudentStore
+
+
+def iter_cohort_ndjson(store: StudentStore, module_codes: Sequence[str],
+                       student_ids: Optional[np.ndarray] = None, risk_filter: Optional[Sequence[str]] = None,
+                       cursor: int = 0, chunk_size: int = 1000) -> Iterator[bytes]:
+    """Yield NDJSON lines (one chunk of rows per item) for a cohort.
+
+    Each row is ``{"student_id", "module_code", "success_proba", "risk_level",
+    "cursor"}`` where ``cursor`` resumes right after that row. The last line is
+    ``{"end": true, "cursor": <total>}``. Memory use is bounded by
+    ``chunk_size`` whatever the cohort size.
+    """
+    ids = store.ids if student_ids is None else np.asarray(student_ids, dtype=np.int64)
+    n_modules = len(module_codes)
+    total = len(ids) * n_modules
+    wanted = set(risk_filter) if risk_filter else None
+    # JSON fragments per module, built once
+    module_json = [json.dumps(code, ensure_ascii=False) for code in module_codes]
+
+    for start in range(cursor, total, chunk_size):
+        positions = np.arange(start, min(start + chunk_size, total))
+        student_idx = positions // n_modules
+        module_idx = positions % n_modules
+
+        # The heuristic only depends on the student: score each student once
+        first, last = student_idx[0], student_idx[-1] + 1
+        chunk_ids = ids[first:last]
+        rows = np.arange(first, last) if student_ids is None else store.rows_of(chunk_ids.tolist())
+        final_proba = heuristic_proba_batch(store.gather("avg_score", rows), store.gather("study_hours_per_week", rows))
+        proba = round2(final_proba).tolist()
+        risk = risk_levels(final_proba).tolist()
+        chunk_ids = chunk_ids.tolist()
+
+        lines = []
+        for p, s, m in zip(positions.tolist(), (student_idx - first).tolist(), module_idx.tolist()):
+            if wanted is not None and risk[s] not in wanted:
+                continue
+            lines.append(
+                f'{{"student_id":{chunk_ids[s]},"module_code":{module_json[m]},'
+                f'"success_proba":{proba[s]!r},"risk_level":"{risk[s]}","cursor":{p + 1}}}\n'
+            )
+        if lines:
+            yield "".join(lines).encode("utf-8")
+
+    yield f'{{"end":true,"cursor":{total}}}\n'.encode("utf-8")
@@ -1,5 +1,5 @@
 """Configuration management for AI Service."""
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 
 
@@ -14,16 +14,85 @@ class Settings(BaseSettings):
     # Security
     jwt_secret_key: str = "dev-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
+    # Bearer JWT on every route that reads student data or writes data; verified claims cached until "exp"
+    auth_enabled: bool = False
+    auth_cache_enabled: bool = True
+    auth_cache_max_entries: int = 10000
+    auth_cache_max_ttl_seconds: float = 300.0
+    # "role" claim required on /admin routes and POST /events
+    auth_admin_role: str = "admin"
     
     # CORS
     cors_origins: List[str] = ["*"]
     
     # Model Configuration
     model_random_state: int = 42
+    # ApiBridge model: artifact loaded in the background and hot-swapped when it changes
+    model_artifact_path: str = ""
+    model_watch_seconds: float = 10.0
+    model_warmup_size: int = 64
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    # Prediction
+    predict_batch_max_pairs: int = 10000
+    
+    # Prediction cache
+    prediction_cache_enabled: bool = True
+    prediction_cache_max_entries: int = 10000
+    prediction_cache_ttl_seconds: float = 300.0
+    
+    # Micro-batching of concurrent predictions
+    predict_batching_enabled: bool = False
+    batch_max_size: int = 64
+    batch_max_delay_ms: float = 2.0
+    batch_max_queue: int = 1024
+    
+    # ApiBridge student CSV: seconds between checks for a new version (0 = only at start)
+    student_data_refresh_seconds: float = 5.0
+    
+    # Single-flight: identical concurrent /predict and /reco computations run once
+    single_flight_enabled: bool = True
+    
+    # Push of risk changes over Server-Sent Events (GET /risk/stream)
+    risk_stream_min_delta: float = 0.05
+    risk_stream_max_pairs: int = 1000
+    risk_stream_max_subscriptions: int = 10000
+    risk_stream_keepalive_seconds: float = 15.0
+    
+    # Streaming cohort scoring
+    cohort_stream_chunk_size: int = 1000
+    
+    # Response serialization: strict mode validates every response against its model
+    strict_response_validation: bool = False
+    response_cache_max_entries: int = 1024
+    
+    # Conditional requests (ETag / If-None-Match) on /reco and /generate_quiz
+    etag_enabled: bool = True
+    reco_cache_control: str = "private, no-cache"
+    quiz_cache_control: str = "public, max-age=300"
+    
+    # Metrics (/metrics, Prometheus text format); spans time internal code paths
+    metrics_enabled: bool = True
+    metrics_spans_enabled: bool = False
+    
+    # Activity event ingestion (empty path = in-memory only); stored metrics count
+    # as this many events when event aggregates are merged into them
+    ingestion_log_path: str = ""
+    ingestion_baseline_weight: float = 10.0
+    
+    # Resource catalog file, JSON array or JSON Lines (empty = bundled mock resources)
+    resource_catalog_path: str = ""
+    
+    # Similar-student recommendations
+    knn_exact_max_students: int = 20000
+    knn_probe_cells: int = 8
+    reco_neighbours: int = 25
+    
+    # Quiz generation (empty path = bundled app/data/quiz_bank.json)
+    quiz_bank_path: str = ""
+    quiz_questions_per_quiz: int = 5
+    
+    # "model_*" settings are ours: only reserve pydantic's "settings_" namespace
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, protected_namespaces=("settings_",))
 
 
 settings = Settings()
@@ -3,7 +3,15 @@
 This module provides sample data for development and testing.
 In production, replace with actual database queries.
 """
-from typing import Dict, List, Optional
+import hashlib
+import json
+import secrets
+from typing import Dict, List, Mapping, Optional
+
+from .config import settings
+from .libs.metrics import timed
+from .resource_index import ResourceIndex
+from .student_store import StudentStore
 
 
 # Mock student data with engagement metrics
@@ -41,6 +49,20 @@ STUDENTS_DATA = {
 }
 
 
+# Metrics used for students missing from the store
+DEFAULT_STUDENT_METRICS = {
+    "avg_score": 75.0,
+    "attendance_rate": 0.85,
+    "assignment_completion": 0.88,
+    "forum_participation": 20,
+    "study_hours_per_week": 12,
+    "previous_modules_passed": 5,
+}
+
+# Columnar store backing all student lookups
+STUDENT_STORE = StudentStore.from_records(STUDENTS_DATA.values(), defaults=DEFAULT_STUDENT_METRICS)
+
+
 # Mock module data
 MODULES_DATA = {
     "CS101": {
@@ -74,7 +96,14 @@ MODULES_DATA = {
 }
 
 
-# Mock learning resources
+# Content stamp of the module data (part of recommendation ETags)
+MODULES_VERSION = hashlib.sha1(json.dumps(MODULES_DATA, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+
+# Identifies this process's in-memory data: version counters restart with it
+DATA_EPOCH = secrets.token_hex(4)
+
+
+# Mock learning resources (loaded into RESOURCE_INDEX unless a catalog file is configured)
 LEARNING_RESOURCES = [
     {
         "resource_id": "vid_001",
@@ -143,27 +172,38 @@ LEARNING_RESOURCES = [
 ]
 
 
+# Compact resource catalog: a file when configured (large catalogs), else the mock resources.
+# DataService.add/remove_resource update it in place
+RESOURCE_INDEX = (
+    ResourceIndex.load(settings.resource_catalog_path) if settings.resource_catalog_path
+    else ResourceIndex(LEARNING_RESOURCES)
+)
+
+
 class DataService:
     """Service for accessing student, module, and resource data."""
     
     @staticmethod
-    def get_student(student_id: int) -> Optional[Dict]:
-        """Get student data by ID. Returns a generic student if not found."""
-        student = STUDENTS_DATA.get(student_id)
-        if not student:
-            return {
-                "student_id": student_id,
-                "name": f"Student #{student_id}",
-                "avg_score": 75.0,
-                "attendance_rate": 0.85,
-                "assignment_completion": 0.88,
-                "forum_participation": 20,
-                "study_hours_per_week": 12,
-                "previous_modules_passed": 5,
-            }
-        return student
+    @timed("data_service.get_student")
+    def get_student(student_id: int) -> Optional[Mapping]:
+        """Get student data by ID. Returns a generic student if not found.
+        
+        The result is a read-only row view over the columnar store.
+        """
+        return STUDENT_STORE.row(student_id)
     
     @staticmethod
+    def get_student_store() -> StudentStore:
+        """Get the columnar student store for bulk computations."""
+        return STUDENT_STORE
+    
+    @staticmethod
+    def update_student(student_id: int, **metrics) -> None:
+        """Update some metrics of a student (created from defaults if unknown)."""
+        STUDENT_STORE.update(student_id, **metrics)
+    
+    @staticmethod
+    @timed("data_service.get_module")
     def get_module(module_code: str) -> Optional[Dict]:
         """Get module data by code. Returns a generic module if not found."""
         module = MODULES_DATA.get(module_code)
@@ -178,32 +218,51 @@ class DataService:
         return module
     
     @staticmethod
-    def get_resources_for_module(module_code: str, limit: int = 5) -> List[Dict]:
-        """Get learning resources relevant to a module."""
-        module = DataService.get_module(module_code)
+    @timed("data_service.get_resources_for_module")
+    def get_resources_for_module(module_code: str, limit: int = 5) -> List[Mapping]:
+        """Get learning resources relevant to a module.
         
-        module_topics = set(module["topics"])
+        Resources are ranked by topic overlap with the module, then by how well
+        their difficulty fits the module's.
+        """
+        module = DataService.get_module(module_code)
         
-        # Filter resources by matching topics
-        relevant_resources = [
-            resource for resource in LEARNING_RESOURCES
-            if any(topic in module_topics for topic in resource["topics"])
-        ]
+        relevant_resources = RESOURCE_INDEX.top_k(module["topics"], module["difficulty"], limit)
         
         # If no specific matches, return a slice of all resources
         if not relevant_resources:
-            return LEARNING_RESOURCES[:limit]
+            return RESOURCE_INDEX.first(limit)
             
-        return relevant_resources[:limit]
+        return relevant_resources
+    
+    @staticmethod
+    def get_catalog_stamp() -> str:
+        """Version stamp of the resource catalog and module data."""
+        return f"{DATA_EPOCH}.{RESOURCE_INDEX.version}.{MODULES_VERSION}"
+    
+    @staticmethod
+    def get_resource_index() -> ResourceIndex:
+        """Get the resource catalog and its topic matching."""
+        return RESOURCE_INDEX
+    
+    @staticmethod
+    def add_resource(resource: Mapping) -> None:
+        """Add a learning resource, replacing one with the same ID."""
+        RESOURCE_INDEX.add(resource)
+    
+    @staticmethod
+    def remove_resource(resource_id: str) -> bool:
+        """Remove a learning resource. Returns False if it did not exist."""
+        return RESOURCE_INDEX.remove(resource_id)
     
     @staticmethod
-    def get_all_students() -> Dict[int, Dict]:
+    def get_all_students() -> Mapping[int, Mapping]:
         """Get all student data.
         
         Returns:
-            Dictionary of all students
+            Read-only mapping of student ID to student row view
         """
-        return STUDENTS_DATA
+        return STUDENT_STORE
     
     @staticmethod
     def get_all_modules() -> Dict[str, Dict]:
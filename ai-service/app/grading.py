@@ -0,0 +1,100 @@
+"""Vectorized grading of quiz submissions against the question bank's answer keys.
+
+Submissions are graded as one ``students x questions`` answer matrix compared
+with the key vector in a single NumPy operation. The same pass yields the
+classical item statistics teachers use to review a quiz:
+
+- ``p_value``: share of students answering the item correctly (difficulty
+  index, higher = easier);
+- ``discrimination``: corrected point-biserial correlation between the item
+  and the rest score (total without that item); undefined (None) when either
+  side is constant.
+"""
+from typing import Dict, List, Mapping, NamedTuple, Sequence
+
+import numpy as np
+
+from .libs.metrics import timed
+from .scoring import round2
+
+
+class GradingResult(NamedTuple):
+    correct: np.ndarray          # (students,) number of correct answers
+    score: np.ndarray            # (students,) percentage, rounded to 2 decimals
+    p_value: np.ndarray          # (questions,)
+    discrimination: np.ndarray   # (questions,) NaN where undefined
+    unanswered: np.ndarray       # (questions,) share of -1 answers
+
+
+def answer_key(questions: Sequence[Mapping]) -> np.ndarray:
+    """Correct option index of each question."""
+    return np.array([q["correctAnswer"] for q in questions], dtype=np.int16)
+
+
+def option_counts(questions: Sequence[Mapping]) -> np.ndarray:
+    """Number of options of each question."""
+    return np.array([len(q["options"]) for q in questions], dtype=np.int16)
+
+
+def invalid_answer_columns(answers: np.ndarray, n_options: np.ndarray) -> np.ndarray:
+    """Indexes of the questions with an answer past their last option."""
+    return np.flatnonzero((answers >= n_options).any(axis=0))
+
+
+def answer_matrix(answers: Sequence[Sequence[int]]) -> np.ndarray:
+    """``int16`` matrix of chosen option indexes (-1 = unanswered)."""
+    return np.array(answers, dtype=np.int16).reshape(len(answers), -1)
+
+
+@timed("grading.grade_matrix")
+def grade_matrix(answers: np.ndarray, key: np.ndarray) -> GradingResult:
+    """Grade a ``(students, questions)`` answer matrix against ``key``."""
+    is_correct = answers == key
+    n_students, n_questions = is_correct.shape
+    correct = is_correct.sum(axis=1)
+
+    p_value = is_correct.sum(axis=0) / n_students
+    # Item vs rest score, all questions at once: cov(x, t - x) = cov(x, t) - var(x)
+    total = correct.astype(np.float64)
+    total_centered = total - total.mean()
+    cov_total = total_centered @ is_correct.astype(np.float64) / n_students
+    var_item = p_value * (1.0 - p_value)
+    var_total = (total_centered ** 2).mean()
+    cov_rest = cov_total - var_item
+    var_rest = var_total - 2.0 * cov_total + var_item
+    with np.errstate(invalid="ignore", divide="ignore"):
+        denominator = np.sqrt(var_item * var_rest)
+        discrimination = np.where(denominator > 1e-12, cov_rest / denominator, np.nan)
+
+    return GradingResult(
+        correct=correct,
+        score=round2(correct * (100.0 / n_questions)),
+        p_value=p_value,
+        discrimination=discrimination,
+        unanswered=(answers < 0).mean(axis=0),
+    )
+
+
+def grading_payload(student_ids: Sequence[int], question_ids: Sequence[int], result: GradingResult) -> Dict:
+    """``QuizGradingResponse`` content for a grading result."""
+    discrimination: List = np.round(result.discrimination, 4).tolist()
+    p_value = np.round(result.p_value, 4).tolist()
+    unanswered = np.round(result.unanswered, 4).tolist()
+    return {
+        "n_submissions": len(student_ids),
+        "n_questions": len(question_ids),
+        "mean_score": round(float(result.correct.mean()) * 100.0 / len(question_ids), 2),
+        "scores": [
+            {"student_id": sid, "correct": correct, "score": score}
+            for sid, correct, score in zip(student_ids, result.correct.tolist(), result.score.tolist())
+        ],
+        "questions": [
+            {
+                "question_id": qid,
+                "p_value": p_value[j],
+                "discrimination": None if discrimination[j] != discrimination[j] else discrimination[j],
+                "unanswered": unanswered[j],
+            }
+            for j, qid in enumerate(question_ids)
+        ],
+    }
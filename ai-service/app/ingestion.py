@@ -0,0 +1,224 @@
+"""Incremental ingestion of raw activity events into per-student aggregates.
+
+Each event updates a student's running aggregates in O(1) (streaming mean of
+assessment scores, counters for sessions, missed assessments and forum
+posts). Event ids make ingestion idempotent, and accepted events are appended
+to a compact log (one JSON array per line) that is replayed on start-up.
+
+Events refine the metrics a student already has in the store rather than
+replacing them: only metrics backed by events are written, merged with the
+stored values the student had when its first event arrived.
+"""
+import json
+import os
+import threading
+from typing import Dict, Iterable, Mapping, Optional, Set
+
+from .student_store import StudentStore
+
+
+EVENT_TYPES = ("assessment_submitted", "assessment_missed", "session_attended", "session_missed", "forum_post")
+_EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+# Store metrics that events refine
+_MERGED_METRICS = ("avg_score", "assignment_completion", "attendance_rate", "forum_participation")
+
+
+class StudentAggregates:
+    """Running aggregates of one student's activity."""
+
+    __slots__ = ("assessments", "score_mean", "assessments_missed", "sessions_attended", "sessions_missed",
+                 "forum_posts", "baseline")
+
+    def __init__(self, baseline: Optional[Mapping] = None):
+        self.assessments = 0
+        self.score_mean = 0.0
+        self.assessments_missed = 0
+        self.sessions_attended = 0
+        self.sessions_missed = 0
+        self.forum_posts = 0
+        # Stored metrics before the first event (None for students not in the store)
+        self.baseline = baseline
+
+    def apply(self, code: int, score: Optional[float]):
+        if code == 0:
+            self.assessments += 1
+            self.score_mean += (score - self.score_mean) / self.assessments
+        elif code == 1:
+            self.assessments_missed += 1
+        elif code == 2:
+            self.sessions_attended += 1
+        elif code == 3:
+            self.sessions_missed += 1
+        else:
+            self.forum_posts += 1
+
+    def metrics(self) -> Dict:
+        """Student metrics derivable from the events seen so far."""
+        metrics = {}
+        if self.forum_posts:
+            metrics["forum_participation"] = self.forum_posts
+        if self.assessments:
+            metrics["avg_score"] = self.score_mean
+        if self.assessments or self.assessments_missed:
+            metrics["assignment_completion"] = self.assessments / (self.assessments + self.assessments_missed)
+        if self.sessions_attended or self.sessions_missed:
+            metrics["attendance_rate"] = self.sessions_attended / (self.sessions_attended + self.sessions_missed)
+        return metrics
+
+    def merged_metrics(self, baseline_weight: float) -> Dict:
+        """Event metrics merged into the baseline: what to write to the store.
+
+        The stored mean score and rates count as ``baseline_weight`` earlier
+        events; forum posts add to the stored forum participation.
+        """
+        metrics = self.metrics()
+        baseline = self.baseline
+        if baseline is None:
+            return metrics
+        if "forum_participation" in metrics:
+            metrics["forum_participation"] += baseline["forum_participation"]
+        if "avg_score" in metrics:
+            metrics["avg_score"] = ((baseline["avg_score"] * baseline_weight + self.score_mean * self.assessments)
+                                    / (baseline_weight + self.assessments))
+        if "assignment_completion" in metrics:
+            metrics["assignment_completion"] = _merged_rate(
+                baseline["assignment_completion"], baseline_weight, self.assessments, self.assessments_missed)
+        if "attendance_rate" in metrics:
+            metrics["attendance_rate"] = _merged_rate(
+                baseline["attendance_rate"], baseline_weight, self.sessions_attended, self.sessions_missed)
+        return metrics
+
+
+def _merged_rate(rate: float, weight: float, hits: int, misses: int) -> float:
+    return (rate * weight + hits) / (weight + hits + misses)
+
+
+class EventIngestor:
+    """Idempotent event ingestion with an append-only log.
+
+    When a ``store`` is given, the metrics of every student touched by a batch
+    are written to it once per batch, so predictions and the risk matrix see
+    them immediately. A student's stored metrics are captured at its first
+    event and count as ``baseline_weight`` events in the merged values.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, store: Optional[StudentStore] = None,
+                 baseline_weight: float = 10.0):
+        self.log_path = log_path
+        self.store = store
+        self.baseline_weight = baseline_weight
+        self._lock = threading.Lock()
+        self._aggregates: Dict[int, StudentAggregates] = {}
+        self._seen: Set[str] = set()
+        self._log = None
+        if log_path:
+            self.replay()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def replay(self) -> int:
+        """Rebuild state from the log. Returns the number of events replayed."""
+        if not self.log_path or not os.path.exists(self.log_path):
+            return 0
+        touched = set()
+        with self._lock, open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event_id, student_id, code, score = json.loads(line)
+                except ValueError:
+                    # Torn last line after a crash
+                    continue
+                if event_id in self._seen:
+                    continue
+                self._seen.add(event_id)
+                self._aggregates_of(student_id).apply(code, score)
+                touched.add(student_id)
+        self._publish(touched)
+        return len(self._seen)
+
+    def ingest(self, events: Iterable[Mapping]) -> Dict[str, int]:
+        """Apply a batch of events; already-seen event ids are skipped.
+
+        Events are mappings with ``event_id``, ``student_id``, ``type`` (one of
+        :data:`EVENT_TYPES`) and, for ``assessment_submitted``, ``score``. The
+        whole batch is validated before any event is applied.
+        """
+        parsed = []
+        for event in events:
+            event_id = str(event["event_id"])
+            code = _EVENT_CODES.get(event["type"])
+            if code is None:
+                raise ValueError(f"Event {event_id}: unknown type {event['type']!r}")
+            # Only assessment submissions carry a score
+            score = event.get("score") if code == 0 else None
+            if code == 0 and score is None:
+                raise ValueError(f"Event {event_id}: assessment_submitted requires a score")
+            parsed.append((event_id, int(event["student_id"]), code, score))
+
+        accepted = duplicates = 0
+        touched = set()
+        lines = []
+        with self._lock:
+            for event_id, student_id, code, score in parsed:
+                if event_id in self._seen:
+                    duplicates += 1
+                    continue
+                self._seen.add(event_id)
+                self._aggregates_of(student_id).apply(code, score)
+                touched.add(student_id)
+                lines.append(json.dumps([event_id, student_id, code, score], separators=(",", ":")))
+                accepted += 1
+            if lines and self.log_path:
+                self._append_log(lines)
+        self._publish(touched)
+        return {"accepted": accepted, "duplicates": duplicates}
+
+    def aggregates(self, student_id: int) -> Optional[Dict]:
+        """Current metrics of a student, or None if no event was seen."""
+        aggregates = self._aggregates.get(student_id)
+        return aggregates.metrics() if aggregates is not None else None
+
+    def published_metrics(self, student_id: int) -> Optional[Dict]:
+        """Stored metrics of a student with events (the merged values), or None."""
+        if self.store is None or student_id not in self._aggregates:
+            return None
+        return dict(self.store.row(student_id))
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _aggregates_of(self, student_id: int) -> StudentAggregates:
+        aggregates = self._aggregates.get(student_id)
+        if aggregates is None:
+            baseline = None
+            if self.store is not None and student_id in self.store:
+                row = self.store[student_id]
+                baseline = {name: row[name] for name in _MERGED_METRICS}
+            aggregates = self._aggregates[student_id] = StudentAggregates(baseline)
+        return aggregates
+
+    def _append_log(self, lines):
+        if self._log is None:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._log = open(self.log_path, "a+b")
+            # Terminate a line torn by a crash so the next record stays parseable
+            if self._log.tell() > 0:
+                self._log.seek(-1, os.SEEK_END)
+                if self._log.read(1) != b"\n":
+                    self._log.write(b"\n")
+        self._log.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self._log.flush()
+
+    def _publish(self, student_ids):
+        if self.store is None:
+            return
+        for student_id in student_ids:
+            metrics = self._aggregates[student_id].merged_metrics(self.baseline_weight)
+            if metrics:
+                self.store.update(student_id, **metrics)
@@ -1,82 +1,316 @@
 import random
 import os
-import pandas as pd
+import threading
+import time
+
+import numpy as np
+
+from ..config import settings
+from ..scoring import round2
+from .batcher import MicroBatcher
+from .columnar_cache import SharedColumns
+from .metrics import timed
+from .model_manager import ModelManager, ModelUnavailable
+from .prediction_cache import PredictionCache
+from .single_flight import SingleFlight, ThreadSingleFlight
+from .simulation import simulate_proba, simulate_proba_batch
 
 # Pont de données IA - Version Robuste & Autonome
 # - Tente de charger les vraies données (CSV)
 # - Bascule sur la simulation si les fichiers sont absents
 # - Supporte l'injection de données temps réel (Level 3)
+# - Le CSV est chargé à la première utilisation puis mis en cache (.npy mmap)
+# - Ce cache est partagé en lecture seule par tous les workers (une copie en RAM, pas une par process)
+
+DEFAULT_STUDENTS_FILE = os.path.join(
+    # Remonte de app/libs -> app -> root -> data/processed
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data", "processed", "student_info_normalized.csv",
+)
+
 
 class ApiBridge:
-    def __init__(self):
+    def __init__(self, students_file=None, cache_dir=None, metrics_source=None, recommendation_source=None):
         print("🔧 ApiBridge: Initialisation...")
-        self.students = pd.DataFrame()
-        self.predictor = None
+        self.students_file = students_file or DEFAULT_STUDENTS_FILE
+        self.cache_dir = cache_dir
+        # Callable student_id -> métriques issues des événements, fusionnées avec les métriques
+        # stockées (ex. EventIngestor.published_metrics), None si aucun événement
+        self.metrics_source = metrics_source
+        # Callable (student_id, module_code) -> recommandations (ex. étudiants similaires)
+        self.recommendation_source = recommendation_source
+        # Modèle chargé en arrière-plan : la simulation répond tant qu'il n'est pas prêt
+        self.models = ModelManager(
+            self._build_predictor,
+            settings.model_artifact_path or None,
+            warmup=self._warmup_predictor,
+            watch_seconds=settings.model_watch_seconds,
+        )
+        # Colonnes mappées depuis le cache colonnaire partagé, versionnées par le CSV source
+        self._data = SharedColumns(self.students_file, cache_dir)
+        self._columns = None
+        self._data_version = None
+        self._students = None
+        self._next_data_check = 0.0
+        self._load_lock = threading.Lock()
+        self.cache = PredictionCache(
+            max_entries=settings.prediction_cache_max_entries,
+            ttl_seconds=settings.prediction_cache_ttl_seconds,
+        ) if settings.prediction_cache_enabled else None
+        # Regroupe les appels concurrents en un seul appel modèle
+        self.batcher = MicroBatcher(
+            self.score_batch,
+            max_batch_size=settings.batch_max_size,
+            max_delay_ms=settings.batch_max_delay_ms,
+            max_queue=settings.batch_max_queue,
+        )
+        # Une seule prédiction en cours par (étudiant, module) : les appels identiques attendent son résultat
+        self.flight = ThreadSingleFlight() if settings.single_flight_enabled else None
+        self.async_flight = SingleFlight() if settings.single_flight_enabled else None
         
-        # Tentative de chargement des données réelles
+        # Les données ne sont pas lues ici : seul l'existence du fichier est vérifiée
+        if os.path.exists(self.students_file):
+            # Chargement du predictor (si présent) sans bloquer le démarrage
+            self.models.start()
+        else:
+            print(f"⚠️ Fichier CSV introuvable ici: {self.students_file}")
+            print("👉 Mode: Simulation Autonome activé.")
+            self.models.unavailable = "student data file not found"
+
+    @property
+    def predictor(self):
+        """Modèle courant (None tant qu'aucun n'est prêt). Lire une seule fois par requête."""
+        return self.models.predictor
+
+    @staticmethod
+    def _build_predictor(artifact_path):
         try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # Remonte de app/libs -> app -> root -> data/processed ?
-            # Ajustez ce chemin selon votre structure réelle si vous avez les CSV
-            data_path = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "data", "processed")
-            students_file = os.path.join(data_path, "student_info_normalized.csv")
-            
-            if os.path.exists(students_file):
-                self.students = pd.read_csv(students_file)
-                print(f"✅ Données CSV chargées: {len(self.students)} étudiants trouvés.")
-                
-                # Tente de charger le predictor si présent
-                try:
-                    from .predictor import SuccessPredictor
-                    self.predictor = SuccessPredictor()
-                    print("✅ Modèle XGBoost chargé.")
-                except ImportError:
-                    print("⚠️ Predictor non trouvé, usage simulation.")
+            from .predictor import SuccessPredictor
+        except ImportError as e:
+            print("⚠️ Predictor non trouvé, usage simulation.")
+            raise ModelUnavailable(f"predictor module not found ({e})")
+        print(f"⏳ Chargement du modèle ({artifact_path or 'par défaut'})...")
+        return SuccessPredictor(artifact_path) if artifact_path else SuccessPredictor()
+
+    def _warmup_predictor(self, predictor):
+        # Lot fixe passé au modèle avant la bascule : rejette un artefact inutilisable
+        size = settings.model_warmup_size
+        columns = self.columns
+        if "id_student" in columns and "code_module" in columns:
+            student_ids = [int(sid) for sid in columns["id_student"][:size]]
+            module_codes = [str(code) for code in columns["code_module"][:size]]
+        else:
+            student_ids = list(range(1, size + 1))
+            module_codes = ["CS101"] * size
+        probas = np.asarray(predictor.predict_batch(student_ids, module_codes), dtype=np.float64)
+        if probas.shape != (len(student_ids),) or not np.all(np.isfinite(probas)):
+            raise ValueError(f"warm-up batch returned {probas.shape} values, expected {len(student_ids)} finite")
+        print(f"✅ Modèle prêt ({len(student_ids)} prédictions de chauffe).")
+
+    @property
+    def columns(self):
+        """Colonnes du CSV étudiants ({nom: ndarray en lecture seule}), chargées au premier accès."""
+        interval = settings.student_data_refresh_seconds
+        if self._columns is not None and interval > 0 and time.monotonic() >= self._next_data_check:
+            self.reload_data()
+        if self._columns is None:
+            with self._load_lock:
+                if self._columns is None:
+                    self._columns = self._load_columns()
+        return self._columns
+
+    @property
+    def data_version(self):
+        """Version du jeu de données chargé (None en simulation)."""
+        self.columns  # charge les données au besoin
+        return self._data_version
+
+    @property
+    def students(self):
+        """DataFrame pandas construit sur les colonnes mappées.
+
+        Aucune copie par worker : colonnes numériques utilisées telles quelles,
+        colonnes texte en ``category`` sur les codes mappés.
+        """
+        columns = self.columns
+        students = self._students
+        if students is None or students[0] != self._data_version:
+            if self._data_version is None:
+                import pandas as pd
+                students = (None, pd.DataFrame(columns, copy=False))
             else:
-                print(f"⚠️ Fichier CSV introuvable ici: {students_file}")
-                print("👉 Mode: Simulation Autonome activé.")
-                
+                students = self._data.frame()
+            self._students = students
+        return students[1]
+
+    def reload_data(self):
+        """Bascule sur la nouvelle version du CSV si le fichier a changé.
+
+        Le remplacement est atomique : les appels en cours gardent l'ancienne
+        version, les suivants voient la nouvelle. Renvoie True si la version a changé.
+        """
+        self._next_data_check = time.monotonic() + settings.student_data_refresh_seconds
+        if self._columns is None or self._data_version is None:
+            return False
+        with self._load_lock:
+            try:
+                if not self._data.refresh():
+                    return False
+            except OSError as e:
+                print(f"⚠️ Rechargement des données impossible ({e}), version {self._data_version} conservée.")
+                return False
+            self._data_version, self._columns = self._data.snapshot()
+        print(f"🔄 Données CSV rechargées: version {self._data_version}.")
+        return True
+
+    @timed("api_bridge.load_columns")
+    def _load_columns(self):
+        self._next_data_check = time.monotonic() + settings.student_data_refresh_seconds
+        try:
+            if os.path.exists(self.students_file):
+                self._data_version, columns = self._data.snapshot()
+                n_rows = len(next(iter(columns.values()))) if columns else 0
+                print(f"✅ Données CSV chargées: {n_rows} étudiants trouvés.")
+                return columns
         except Exception as e:
             print(f"⚠️ Erreur init données: {e}")
             print("👉 Mode: Simulation Autonome activé.")
+        return {}
+
+    @property
+    def prediction_version(self):
+        """Identifie le modèle/les données utilisés (clé de cache)."""
+        current = self.models.current
+        return f"model:{current.version}:{self.data_version}" if current is not None else "simulation"
 
     def get_prediction(self, student_id, module_code):
         # Méthode par défaut (sans injection)
-        return self._simulate_prediction(student_id, module_code)
+        version = self.prediction_version
+        if self.cache is not None:
+            result = self.cache.get(student_id, module_code, version)
+            if result is not None:
+                return result
+        
+        if self.flight is not None:
+            result = self.flight.do((student_id, module_code, version),
+                                    lambda: self._predict(student_id, module_code))
+        else:
+            result = self._predict(student_id, module_code)
+        if self.cache is not None:
+            self.cache.put(student_id, module_code, version, result)
+        return result
+
+    async def get_prediction_async(self, student_id, module_code):
+        """Comme ``get_prediction``, mais les appels concurrents sont micro-batchés.
+
+        Lève ``BatcherOverloaded`` si la file d'attente est pleine.
+        """
+        version = self.prediction_version
+        if self.cache is not None:
+            result = self.cache.get(student_id, module_code, version)
+            if result is not None:
+                return result
+        if self.async_flight is not None:
+            result = await self.async_flight.do((student_id, module_code, version),
+                                                lambda: self.batcher.submit((student_id, module_code)))
+        else:
+            result = await self.batcher.submit((student_id, module_code))
+        if self.cache is not None:
+            self.cache.put(student_id, module_code, version, result)
+        return result
+
+    @timed("api_bridge.predict")
+    def _predict(self, student_id, module_code):
+        if self.predictor is None:
+            return self._simulate_prediction(student_id, module_code)
+        return self.score_batch([(student_id, module_code)])[0]
+
+    @timed("api_bridge.score_batch")
+    def score_batch(self, pairs):
+        """Score une liste de (student_id, module_code) en un seul appel.
+
+        Utilise ``predictor.predict_batch(student_ids, module_codes)`` (une
+        probabilité par paire) si un modèle est chargé, sinon la simulation
+        vectorisée. Résultats dans l'ordre des paires.
+        """
+        student_ids = [sid for sid, _ in pairs]
+        module_codes = [code for _, code in pairs]
+        probas, msg = self.score_arrays(student_ids, module_codes)
+        return [
+            self._format_result(sid, code, float(proba), msg)
+            for sid, code, proba in zip(student_ids, module_codes, probas)
+        ]
+
+    def score_arrays(self, student_ids, module_codes):
+        """Probabilités brutes (avant plafonnement) et message, sans construire de dicts.
+
+        ``module_codes`` : un code pour toute la liste ou un code par étudiant.
+        """
+        predictor = self.predictor
+        if predictor is not None:
+            if isinstance(module_codes, str):
+                module_codes = [module_codes] * len(student_ids)
+            probas = predictor.predict_batch(list(student_ids), list(module_codes))
+            return np.asarray(probas, dtype=np.float64), "Prédiction Modèle"
+        return simulate_proba_batch(np.asarray(student_ids, dtype=np.int64), module_codes), "Simulation (Donnée manquante)"
+
+    @staticmethod
+    def format_arrays(probas):
+        """Version vectorisée de ``_format_result`` : (success_proba, risk_level), mêmes valeurs."""
+        capped = np.clip(probas, 0.0, 0.99)
+        risk = np.where(capped > 0.75, "Low", np.where(capped > 0.45, "Medium", "High")).astype(object)
+        return round2(capped), risk
 
     def get_prediction_with_injection(self, student_id, module_code, custom_metrics=None):
         # LEVEL 3 : Injection de données du Frontend
+        # À défaut, lecture directe des agrégats d'événements (si disponibles)
+        if not custom_metrics and self.metrics_source is not None:
+            aggregated = self.metrics_source(student_id)
+            if aggregated and "avg_score" in aggregated:
+                return self._format_result(student_id, module_code, self._injected_proba(aggregated),
+                                           "Prédiction Temps Réel (Agrégats)")
+        
         if custom_metrics:
             print(f"💉 ApiBridge: Injection reçue pour {student_id}")
             
-            # Calcul du score basé sur les métriques injectées
-            avg_score = custom_metrics.get('avg_score', 50)
-            
-            # Logique simple de prédiction (si pas de modèle ML chargé)
-            # Base = note / 100
-            proba = avg_score / 100.0
-            
-            # Facteurs d'ajustement
-            attempts = custom_metrics.get('num_of_prev_attempts', 0)
-            if attempts == 0: proba += 0.05
-            if attempts > 2: proba -= 0.10
+            # Nouvelles métriques : les prédictions en cache de cet étudiant sont périmées
+            if self.cache is not None:
+                self.cache.invalidate_student(student_id)
             
+            proba = self._injected_proba(custom_metrics)
             return self._format_result(student_id, module_code, proba, "Prédiction Temps Réel (Injectée)")
             
-        return self._simulate_prediction(student_id, module_code)
+        return self.get_prediction(student_id, module_code)
+
+    @staticmethod
+    def _injected_proba(metrics):
+        # Calcul du score basé sur les métriques injectées
+        avg_score = metrics.get('avg_score', 50)
+        
+        # Logique simple de prédiction (si pas de modèle ML chargé)
+        # Base = note / 100
+        proba = avg_score / 100.0
+        
+        # Facteurs d'ajustement
+        attempts = metrics.get('num_of_prev_attempts', 0)
+        if attempts == 0: proba += 0.05
+        if attempts > 2: proba -= 0.10
+        return proba
 
     def _simulate_prediction(self, student_id, module_code):
-        # Simulation stable basée sur l'ID
-        try:
-            seed = int(student_id) + sum(ord(c) for c in module_code)
-        except:
-            seed = 123
-            
-        random.seed(seed)
-        proba = random.uniform(0.45, 0.95)
+        # Simulation stable basée sur l'ID (fonction pure, sans état global)
+        proba = simulate_proba(student_id, module_code)
         
         return self._format_result(student_id, module_code, proba, "Simulation (Donnée manquante)")
 
+    def simulate_cohort(self, student_ids, module_codes):
+        """Probabilités simulées (non plafonnées) pour un tableau NumPy d'IDs.
+
+        ``module_codes`` : un code pour toute la cohorte ou un code par étudiant.
+        Identique, valeur par valeur, à ``_simulate_prediction``.
+        """
+        return simulate_proba_batch(student_ids, module_codes)
+
     def _format_result(self, student_id, module_code, proba, msg):
         proba = max(0.0, min(0.99, proba)) # Cap à 99%
         
@@ -93,6 +327,11 @@ class ApiBridge:
         }
 
     def get_recommendations(self, student_id, module_code):
+        if self.recommendation_source is not None:
+            recommendations = self.recommendation_source(student_id, module_code)
+            if recommendations:
+                return recommendations
+        
         # Recommandations simulées mais utiles
         return [
             {
@@ -0,0 +1,124 @@
+"""JWT bearer authentication with a cache of verified claims.
+
+Verifying an HS256 signature and decoding the claims costs far more than a
+request to a hot endpoint, and a client sends the same token on every call.
+:class:`TokenVerifier` verifies a token once with ``python-jose`` and keeps
+its claims in a bounded LRU keyed by the SHA-256 digest of the token (the
+token itself is never stored). An entry is dropped once the token's ``exp``
+has passed, and after ``max_ttl_seconds`` at most, which bounds how long a
+token stays accepted after the signing key is rotated.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from jose import jwt
+from jose.exceptions import JWTError
+
+
+class InvalidToken(Exception):
+    """The bearer token is missing, malformed, badly signed or expired."""
+
+
+class ClaimsCache:
+    """Thread-safe LRU of verified claims, keyed by token digest."""
+
+    def __init__(self, max_entries: int = 10000, max_ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[Dict, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: bytes, now: float) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            claims, expires_at = entry
+            if now >= expires_at:
+                del self._entries[digest]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return claims
+
+    def put(self, digest: bytes, claims: Dict, now: float):
+        expires_at = now + self.max_ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._entries[digest] = (claims, expires_at)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class TokenVerifier:
+    """Verifies bearer JWTs, skipping the signature check for cached tokens."""
+
+    def __init__(self, secret_key: str, algorithm: str = "HS256", cache: Optional[ClaimsCache] = None):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.cache = cache
+        self.verifications = 0
+        self.failures = 0
+
+    def verify(self, token: str) -> Dict:
+        """Claims of a valid token; raises :class:`InvalidToken` otherwise."""
+        now = time.time()
+        digest = None
+        if self.cache is not None:
+            digest = hashlib.sha256(token.encode("utf-8")).digest()
+            claims = self.cache.get(digest, now)
+            if claims is not None:
+                return claims
+
+        self.verifications += 1
+        try:
+            claims = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        except JWTError as e:
+            self.failures += 1
+            raise InvalidToken(str(e)) from e
+        if digest is not None:
+            self.cache.put(digest, claims, now)
+        return claims
+
+    def stats(self) -> Dict:
+        return {
+            "algorithm": self.algorithm,
+            "verifications": self.verifications,
+            "failures": self.failures,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
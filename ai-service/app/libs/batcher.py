@@ -0,0 +1,144 @@
+"""Asyncio micro-batching scheduler for inference calls.
+
+Concurrent callers :meth:`MicroBatcher.submit` single items; a worker task
+collects them for at most ``max_delay_ms`` or ``max_batch_size`` items, runs
+one batched scoring call in a thread (off the event loop) and resolves each
+caller's future individually.
+"""
+import asyncio
+from collections import Counter, deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+
+class BatcherOverloaded(Exception):
+    """Raised by :meth:`MicroBatcher.submit` when the queue is full."""
+
+
+class MicroBatcher:
+    """Dynamic batcher with a bounded queue.
+
+    ``score_batch`` receives a list of items and must return one result per
+    item, in the same order. If it raises, every caller of that batch gets the
+    exception.
+    """
+
+    def __init__(self, score_batch: Callable[[List[Any]], Sequence[Any]], max_batch_size: int = 64,
+                 max_delay_ms: float = 2.0, max_queue: int = 1024, executor: Optional[Executor] = None):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_queue = max_queue
+        self.executor = executor
+        # (item, future, enqueue time on the loop clock)
+        self._pending: Deque[Tuple[Any, asyncio.Future, float]] = deque()
+        self._has_items: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.failed_batches = 0
+        self.batch_sizes = Counter()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        """Start the worker on the running loop (done lazily by :meth:`submit`)."""
+        if self._worker is None or self._worker.done():
+            self._has_items = asyncio.Event()
+            self._batch_full = asyncio.Event()
+            if self._pending:
+                self._has_items.set()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Cancel the worker; queued callers get ``CancelledError``."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._pending:
+            _, future, _ = self._pending.popleft()
+            future.cancel()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result.
+
+        Raises :class:`BatcherOverloaded` instead of waiting when the queue is
+        full, so callers can shed load.
+        """
+        self.start()
+        if len(self._pending) >= self.max_queue:
+            self.rejected += 1
+            raise BatcherOverloaded(f"Inference queue full ({self.max_queue} items)")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, loop.time()))
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        pending = self._pending
+        while True:
+            await self._has_items.wait()
+            # Wait until a full batch is queued or the oldest item has waited max_delay
+            # (items left over from a full batch have already waited part of it)
+            remaining = pending[0][2] + self.max_delay - loop.time() if pending else 0.0
+            if len(pending) < self.max_batch_size and remaining > 0:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [pending.popleft()[:2] for _ in range(min(len(pending), self.max_batch_size))]
+            if not pending:
+                self._has_items.clear()
+
+            # Callers that gave up while queued are not scored
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] += 1
+            try:
+                results = await loop.run_in_executor(self.executor, self.score_batch, [item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"score_batch returned {len(results)} results for {len(batch)} items")
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                self.failed_batches += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> Dict:
+        """Queue depth and batch-size metrics."""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "max_batch_size": self.max_batch_size,
+            "max_delay_ms": self.max_delay * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "rejected": self.rejected,
+            "failed_batches": self.failed_batches,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+        }
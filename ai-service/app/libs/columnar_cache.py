@@ -0,0 +1,219 @@
+"""Binary columnar cache for CSV files.
+
+The first load parses the CSV with pandas and writes one ``.npy`` file per
+column into a directory keyed by the source file's mtime and size. Later loads
+memory-map those files instead of re-parsing, so start-up cost is a few page
+faults and the OS page cache is shared between processes.
+
+Each cache directory is an immutable, versioned snapshot: several worker
+processes map the same files read-only, and only one of them parses a new
+version of the CSV (the others wait on a lock file, then map its output).
+:class:`SharedColumns` swaps a process over to a new version atomically.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows: concurrent first loads may each parse
+    fcntl = None
+
+
+MANIFEST = "manifest.json"
+
+
+def cache_key(csv_path: str) -> str:
+    """Cache directory name for the current version of a CSV file."""
+    stat = os.stat(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return f"{stem}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def load_columns(csv_path: str, cache_root: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Load a CSV as ``{column: array}``, memory-mapped from the cache when fresh.
+
+    String columns are stored as fixed-width unicode arrays (missing values
+    become empty strings). If the cache cannot be written the parsed columns
+    are returned directly.
+    """
+    return _load(csv_path, cache_root)[1]
+
+
+def _load(csv_path: str, cache_root: Optional[str]) -> Tuple[Optional[str], Dict[str, np.ndarray]]:
+    """``(cache directory or None, columns)`` for the current version of the CSV."""
+    cache_root = cache_root or os.path.join(os.path.dirname(os.path.abspath(csv_path)), ".cache")
+    cache_dir = os.path.join(cache_root, cache_key(csv_path))
+
+    if os.path.exists(os.path.join(cache_dir, MANIFEST)):
+        return cache_dir, _read_cache(cache_dir)
+
+    try:
+        with _build_lock(cache_root, os.path.basename(cache_dir)):
+            # Another worker may have built this version while we waited
+            if not os.path.exists(os.path.join(cache_dir, MANIFEST)):
+                _write_cache(cache_dir, _parse_csv(csv_path))
+    except OSError as e:
+        print(f"⚠️ Cache colonnaire non écrit ({e}), lecture CSV à chaque démarrage.")
+        return None, _parse_csv(csv_path)
+    return cache_dir, _read_cache(cache_dir)
+
+
+@contextmanager
+def _build_lock(cache_root: str, version: str):
+    """Exclusive lock serializing the parse of one CSV version across processes."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(cache_root, exist_ok=True)
+    stem = version.rsplit("-", 2)[0]
+    with open(os.path.join(cache_root, f".{stem}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _parse_csv(csv_path: str) -> Dict[str, np.ndarray]:
+    import pandas as pd
+
+    frame = pd.read_csv(csv_path)
+    columns = {}
+    for name in frame.columns:
+        series = frame[name]
+        if series.dtype.kind in "biuf":
+            columns[name] = series.to_numpy()
+        else:
+            columns[name] = series.fillna("").astype(str).to_numpy(dtype=str)
+    return columns
+
+
+def _write_cache(cache_dir: str, columns: Dict[str, np.ndarray]):
+    cache_root = os.path.dirname(cache_dir)
+    os.makedirs(cache_root, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=cache_root)
+    try:
+        files = {}
+        categorical = {}
+        for i, (name, values) in enumerate(columns.items()):
+            files[name] = f"{i:04d}.npy"
+            np.save(os.path.join(tmp_dir, files[name]), values, allow_pickle=False)
+            if values.dtype.kind == "U":
+                # Dictionary-encoded copy: pandas can wrap it without materializing Python strings
+                categories, codes = np.unique(values, return_inverse=True)
+                categorical[name] = [f"{i:04d}.codes.npy", f"{i:04d}.categories.npy"]
+                np.save(os.path.join(tmp_dir, categorical[name][0]), codes.astype(_codes_dtype(len(categories))),
+                        allow_pickle=False)
+                np.save(os.path.join(tmp_dir, categorical[name][1]), categories, allow_pickle=False)
+        with open(os.path.join(tmp_dir, MANIFEST), "w") as f:
+            json.dump({"columns": files, "categorical": categorical}, f)
+        os.replace(tmp_dir, cache_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # Another process may have published the same version first
+        if not os.path.exists(os.path.join(cache_dir, MANIFEST)):
+            raise
+        return
+
+    # Drop caches of older versions of the same file, keeping the newest previous one
+    # for workers still switching over (mapped files stay valid after removal anyway)
+    stem = os.path.basename(cache_dir).rsplit("-", 2)[0]
+    older = sorted(
+        (entry for entry in os.listdir(cache_root)
+         if entry != os.path.basename(cache_dir) and not entry.startswith(".") and entry.rsplit("-", 2)[0] == stem),
+        key=lambda entry: os.path.getmtime(os.path.join(cache_root, entry)),
+    )
+    for entry in older[:-1]:
+        shutil.rmtree(os.path.join(cache_root, entry), ignore_errors=True)
+
+
+def _codes_dtype(n_categories: int):
+    """Smallest code type, as pandas would pick it (so codes are used without a copy)."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _read_cache(cache_dir: str) -> Dict[str, np.ndarray]:
+    with open(os.path.join(cache_dir, MANIFEST)) as f:
+        files = json.load(f)["columns"]
+    return {name: np.load(os.path.join(cache_dir, file), mmap_mode="r") for name, file in files.items()}
+
+
+def _read_categorical(cache_dir: str) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """``{column: (codes, categories)}`` of string columns (empty for older caches)."""
+    with open(os.path.join(cache_dir, MANIFEST)) as f:
+        categorical = json.load(f).get("categorical", {})
+    return {
+        name: (np.load(os.path.join(cache_dir, codes), mmap_mode="r"),
+               np.load(os.path.join(cache_dir, categories)))
+        for name, (codes, categories) in categorical.items()
+    }
+
+
+class SharedColumns:
+    """Read-only columns of a CSV, shared between processes through the columnar cache.
+
+    ``snapshot()`` returns ``(version, columns)`` and is consistent: a
+    concurrent :meth:`refresh` replaces the whole pair at once, so readers never
+    see columns from two versions. Callers holding an older snapshot keep using
+    it safely.
+    """
+
+    def __init__(self, csv_path: str, cache_root: Optional[str] = None):
+        self.csv_path = csv_path
+        self.cache_root = cache_root
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Tuple[str, Optional[str], Dict[str, np.ndarray]]] = None
+
+    def snapshot(self) -> Tuple[str, Dict[str, np.ndarray]]:
+        if self._snapshot is None:
+            self.refresh()
+        version, _, columns = self._snapshot
+        return version, columns
+
+    @property
+    def version(self) -> str:
+        return self.snapshot()[0]
+
+    def refresh(self) -> bool:
+        """Switch to the current version of the CSV; True if it changed."""
+        with self._lock:
+            version = cache_key(self.csv_path)
+            if self._snapshot is not None and self._snapshot[0] == version:
+                return False
+            cache_dir, columns = _load(self.csv_path, self.cache_root)
+            self._snapshot = (version, cache_dir, columns)
+            return True
+
+    def frame(self):
+        """``(version, DataFrame)`` over the mapped columns.
+
+        Numeric columns are used in place. String columns become categoricals
+        over the mapped codes, instead of one Python string per row per process.
+        """
+        import pandas as pd
+
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh()
+            snapshot = self._snapshot
+        version, cache_dir, columns = snapshot
+        categorical = _read_categorical(cache_dir) if cache_dir is not None else {}
+        data = {}
+        for name, values in columns.items():
+            if name in categorical:
+                codes, categories = categorical[name]
+                data[name] = pd.Categorical.from_codes(codes, categories=categories, validate=False)
+            else:
+                data[name] = values
+        return version, pd.DataFrame(data, copy=False)
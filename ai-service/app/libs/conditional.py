@@ -0,0 +1,41 @@
+"""Version-stamped ETags and ``If-None-Match`` handling.
+
+ETags are built from version stamps of the data a response depends on, so a
+repeat request can be answered with ``304 Not Modified`` before the payload
+is built or serialized.
+"""
+from typing import Optional
+
+from starlette.responses import Response
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from version-stamp parts."""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an ``If-None-Match`` header matches ``etag`` (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """Empty ``304`` response carrying the validator and caching policy."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def set_validators(response: Response, etag: str, cache_control: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return response
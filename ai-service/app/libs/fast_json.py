@@ -0,0 +1,74 @@
+"""Fast JSON encoding and a cache of ready-to-send response bodies.
+
+Uses ``orjson`` when it is installed and falls back to the standard library
+encoder with Starlette's compact settings. Both produce UTF-8 JSON bytes that
+decode to the same values.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def dumps(value) -> bytes:
+    """Compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    """Response sending pre-encoded JSON bytes as is (no validation, no re-encoding)."""
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+class BodyCache:
+    """Thread-safe LRU of encoded JSON bodies (or body fragments)."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Hashable, body: bytes):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
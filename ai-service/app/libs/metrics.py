@@ -0,0 +1,234 @@
+"""In-process latency histograms, counters and a Prometheus text exporter.
+
+:class:`MetricsMiddleware` is a pure ASGI middleware that times every HTTP
+request and files it under its route template (``/reco/{student_id}/{module_code}``
+rather than the concrete path, so label cardinality stays bounded). Code paths
+can additionally be timed with :func:`timed` / :meth:`MetricsRegistry.span`;
+those spans are opt-in and cost one attribute check when disabled.
+"""
+import functools
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+
+
+# Upper bounds (seconds) of the latency buckets
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+class Histogram:
+    """Fixed-bucket histogram (non-cumulative counts, the last one is ``+Inf``)."""
+
+    __slots__ = ("bounds", "counts", "total", "count", "_lock")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+class RouteStats(Histogram):
+    """Latency histogram of one route plus its counts per status class (``1xx``-``5xx``)."""
+
+    __slots__ = ("statuses", "exceptions")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(bounds)
+        self.statuses = [0] * 6
+        self.exceptions = 0
+
+    def observe_response(self, seconds: float, status: int):
+        i = bisect_left(self.bounds, seconds)
+        status_class = status // 100 if 1 <= status // 100 <= 5 else 5
+        with self._lock:
+            self.counts[i] += 1
+            self.total += seconds
+            self.count += 1
+            self.statuses[status_class] += 1
+
+
+class MetricsRegistry:
+    """Request histograms, in-flight gauge, status counters and named spans."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, spans_enabled: bool = False):
+        self.buckets = tuple(buckets)
+        self.spans_enabled = spans_enabled
+        self.in_flight = 0
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        self._spans: Dict[str, Histogram] = {}
+
+    # --- Recording ---
+
+    def route_stats(self, method: str, route: str) -> RouteStats:
+        stats = self._routes.get((method, route))
+        if stats is None:
+            stats = self._routes.setdefault((method, route), RouteStats(self.buckets))
+        return stats
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        self.route_stats(method, route).observe_response(seconds, status)
+
+    def count_exception(self, method: str, route: str):
+        stats = self.route_stats(method, route)
+        with stats._lock:
+            stats.exceptions += 1
+
+    def observe_span(self, name: str, seconds: float):
+        histogram = self._spans.get(name)
+        if histogram is None:
+            histogram = self._spans.setdefault(name, Histogram(self.buckets))
+        histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as span ``name`` (no-op when spans are disabled)."""
+        if not self.spans_enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_span(name, perf_counter() - start)
+
+    def reset(self):
+        self._routes.clear()
+        self._spans.clear()
+
+    # --- Export ---
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP aiservice_http_requests_in_flight HTTP requests being served.",
+            "# TYPE aiservice_http_requests_in_flight gauge",
+            f"aiservice_http_requests_in_flight {self.in_flight}",
+        ]
+        routes = {f'method="{m}",route="{_escape(r)}"': stats for (m, r), stats in sorted(self._routes.items())}
+        lines += self._render_histograms(
+            "aiservice_http_request_duration_seconds", "HTTP request latency by route.", routes,
+        )
+        lines += [
+            "# HELP aiservice_http_responses_total HTTP responses by route and status class.",
+            "# TYPE aiservice_http_responses_total counter",
+        ]
+        lines += [f'aiservice_http_responses_total{{{labels},status="{status_class}xx"}} {n}'
+                  for labels, stats in routes.items()
+                  for status_class, n in enumerate(stats.statuses) if n]
+        lines += [
+            "# HELP aiservice_http_request_exceptions_total Requests that raised an unhandled exception.",
+            "# TYPE aiservice_http_request_exceptions_total counter",
+        ]
+        lines += [f"aiservice_http_request_exceptions_total{{{labels}}} {stats.exceptions}"
+                  for labels, stats in routes.items() if stats.exceptions]
+        lines += self._render_histograms(
+            "aiservice_span_duration_seconds", "Duration of instrumented code paths.",
+            {f'span="{_escape(name)}"': h for name, h in sorted(self._spans.items())},
+        )
+        return "\n".join(lines) + "\n"
+
+    def _render_histograms(self, name: str, help_text: str, histograms: Dict[str, Histogram]) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, histogram in histograms.items():
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {total!r}")
+            lines.append(f"{name}_count{{{labels}}} {count}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide registry shared by the middleware and the spans
+METRICS = MetricsRegistry()
+
+
+def timed(name: str):
+    """Decorator recording each call of a function as span ``name`` in :data:`METRICS`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS.spans_enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICS.observe_span(name, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class TimedJSONResponse(JSONResponse):
+    """``JSONResponse`` whose rendering to bytes is recorded as span ``response.serialize``."""
+
+    def render(self, content) -> bytes:
+        with METRICS.span("response.serialize"):
+            return super().render(content)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and status classes per route.
+
+    Requests that match no route are filed under ``route="unmatched"``.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = METRICS):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        registry.in_flight += 1
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            registry.count_exception(scope["method"], _route_of(scope))
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            registry.in_flight -= 1
+            registry.route_stats(scope["method"], _route_of(scope)).observe_response(elapsed, status)
+
+
+def _route_of(scope) -> str:
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
@@ -0,0 +1,177 @@
+"""Background model loading and atomic hot swap.
+
+A :class:`ModelManager` builds the model in a background thread, runs a
+warm-up batch through it and only then publishes it. Callers read
+:attr:`ModelManager.predictor` once per request and use that snapshot, so a
+swap never affects a request already in flight; until the first model is
+ready it is ``None`` and callers use their fallback.
+
+A new artifact is picked up by :meth:`ModelManager.reload` (e.g. from an admin
+endpoint) or by watching the artifact file (``watch_seconds > 0``). A model
+that fails to build or warm up is not published: the current one keeps
+serving and the error is reported in :meth:`ModelManager.status`.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+class LoadedModel(NamedTuple):
+    predictor: Any
+    version: str
+    loaded_at: float
+    load_ms: float
+    warmup_ms: float
+
+
+class ModelUnavailable(Exception):
+    """Raised by a factory when no model can be built at all (e.g. missing package)."""
+
+
+def artifact_version(path: Optional[str]) -> str:
+    """Version of a model artifact: its name, mtime and size (``"default"`` without a file)."""
+    if not path:
+        return "default"
+    stat = os.stat(path)
+    return f"{os.path.basename(path)}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+class ModelManager:
+    """Loads models off the request path and swaps them in atomically.
+
+    ``factory(artifact_path)`` builds a model; ``warmup(model)`` runs a canned
+    batch and raises if the output is unusable.
+    """
+
+    def __init__(self, factory: Callable[[Optional[str]], Any], artifact_path: Optional[str] = None,
+                 warmup: Optional[Callable[[Any], None]] = None, watch_seconds: float = 0.0):
+        self.factory = factory
+        self.artifact_path = artifact_path
+        self.warmup = warmup
+        self.watch_seconds = watch_seconds
+        self._current: Optional[LoadedModel] = None
+        self._lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        self._reload_requested = False
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self.unavailable: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.failed_version: Optional[str] = None
+        self.swaps = 0
+
+    @property
+    def current(self) -> Optional[LoadedModel]:
+        return self._current
+
+    @property
+    def predictor(self):
+        current = self._current
+        return current.predictor if current is not None else None
+
+    @property
+    def ready(self) -> bool:
+        return self._current is not None
+
+    @property
+    def loading(self) -> bool:
+        loader = self._loader
+        return loader is not None and loader.is_alive()
+
+    def start(self):
+        """Load the model in the background and start watching the artifact."""
+        self.reload()
+        if self.watch_seconds > 0 and self.artifact_path and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._watcher.start()
+
+    def reload(self) -> bool:
+        """Request a (re)load of the artifact; False if one is already running (it will reload again)."""
+        with self._lock:
+            if self.unavailable is not None:
+                return False
+            if self.loading:
+                self._reload_requested = True
+                return False
+            self._reload_requested = False
+            self._loader = threading.Thread(target=self._run, name="model-loader", daemon=True)
+            self._loader.start()
+            return True
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def wait_idle(self, timeout: Optional[float] = None):
+        """Block until no load is running (for scripts and benchmarks)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            loader = self._loader
+            if loader is None or not loader.is_alive():
+                return
+            loader.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+    def close(self):
+        self._stop.set()
+
+    def status(self) -> Dict:
+        current = self._current
+        return {
+            "ready": current is not None,
+            "version": current.version if current is not None else None,
+            "loaded_at": current.loaded_at if current is not None else None,
+            "load_ms": round(current.load_ms, 1) if current is not None else None,
+            "warmup_ms": round(current.warmup_ms, 1) if current is not None else None,
+            "loading": self.loading,
+            "swaps": self.swaps,
+            "unavailable": self.unavailable,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        while True:
+            self._load_once()
+            with self._lock:
+                if not self._reload_requested or self._stop.is_set():
+                    return
+                self._reload_requested = False
+
+    def _load_once(self):
+        version = None
+        try:
+            version = artifact_version(self.artifact_path)
+            current = self._current
+            if current is not None and current.version == version:
+                return
+            start = time.perf_counter()
+            predictor = self.factory(self.artifact_path)
+            loaded = time.perf_counter()
+            if self.warmup is not None:
+                self.warmup(predictor)
+            warmed = time.perf_counter()
+        except ModelUnavailable as e:
+            self.unavailable = str(e)
+            return
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            self.failed_version = version
+            return
+        # A single reference assignment: requests see either the old or the new model
+        self._current = LoadedModel(predictor, version, time.time(), (loaded - start) * 1e3, (warmed - loaded) * 1e3)
+        self.last_error = None
+        self.failed_version = None
+        self.swaps += 1
+        self._ready.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.watch_seconds):
+            try:
+                version = artifact_version(self.artifact_path)
+            except OSError:
+                continue  # artifact being replaced or removed: keep serving the current model
+            current = self._current
+            if version != (current.version if current is not None else None) and version != self.failed_version:
+                self.reload()
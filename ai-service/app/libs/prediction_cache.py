@@ -0,0 +1,102 @@
+"""In-process prediction cache with LRU and TTL eviction.
+
+Entries are keyed by ``(student_id, module_code, version)`` where ``version``
+identifies the model/data that produced the prediction, so a new version
+never serves stale results. A per-student key index lets new metrics for one
+student invalidate exactly that student's entries.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+class PredictionCache:
+    """Thread-safe LRU + TTL cache of prediction dicts."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict]]" = OrderedDict()
+        self._by_student: Dict[Hashable, Set[Tuple]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, student_id, module_code: str, version: Hashable) -> Optional[Dict]:
+        """Cached prediction (a shallow copy), or None on miss/expiry."""
+        key = (student_id, module_code, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                self._discard(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def put(self, student_id, module_code: str, version: Hashable, value: Dict):
+        """Store a prediction, evicting the least recently used entries if full."""
+        key = (student_id, module_code, version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (self._clock() + self.ttl_seconds, dict(value))
+            self._by_student.setdefault(student_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate_student(self, student_id) -> int:
+        """Drop every entry of one student. Returns the number dropped."""
+        with self._lock:
+            keys = self._by_student.pop(student_id, ())
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._by_student.clear()
+
+    def stats(self) -> Dict:
+        """Counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _discard(self, key: Tuple):
+        del self._entries[key]
+        keys = self._by_student.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_student[key[0]]
@@ -0,0 +1,130 @@
+"""Coalescing of identical concurrent computations ("single flight").
+
+While a computation for a key is in flight, later callers with the same key
+wait for its result instead of starting their own. Nothing is cached: once
+the computation finishes the key is free again.
+
+- Errors are delivered to every waiter of that flight, and the next call
+  starts a new flight.
+- A waiter that is cancelled only stops waiting; the shared computation
+  goes on for the others.
+- If the caller running the computation is cancelled, the computation stops
+  and one of the waiters starts it again.
+
+:class:`SingleFlight` is for coroutines on one event loop and
+:class:`ThreadSingleFlight` for blocking functions called from threads.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _LeaderCancelled(Exception):
+    """Internal: the caller running a flight was cancelled before it finished."""
+
+
+class SingleFlight:
+    """Asyncio single flight keyed by any hashable."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of ``await func()``, shared with concurrent calls for ``key``."""
+        self.calls += 1
+        counted = False
+        while key in self._flights:
+            if not counted:
+                self.coalesced += 1
+                counted = True
+            try:
+                # Shielded: cancelling this waiter must not cancel the shared flight
+                return await asyncio.shield(self._flights[key])
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            self.errors += 1
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+            if future.done() and not future.cancelled():
+                # Marks the error as retrieved so asyncio does not log it when nobody waited
+                future.exception()
+
+    def stats(self) -> Dict:
+        return {"calls": self.calls, "coalesced": self.coalesced, "errors": self.errors, "in_flight": self.in_flight}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ThreadSingleFlight:
+    """Thread-safe single flight for blocking functions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Result of ``func()``, shared with concurrent calls for ``key``."""
+        with self._lock:
+            self.calls += 1
+            call = self._flights.get(key)
+            leader = call is None
+            if leader:
+                call = self._flights[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            call.done.set()
+
+    def stats(self) -> Dict:
+        return {"calls": self.calls, "coalesced": self.coalesced, "errors": self.errors, "in_flight": self.in_flight}
@@ -1,129 +1,43 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from .models import PredictionRequest, PredictionResponse, RecommendationResponse, QuizRequest, QuizResponse
+from typing import List, Optional
 
-# ... imports ... 
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.concurrency import run_in_threadpool
+from .models import (
+    PredictionRequest, PredictionResponse, BatchPredictionRequest, BatchPredictionResponse,
+    RiskRankingResponse, RiskHistogramResponse, EventBatch, IngestResponse,
+    ResourceFeedback, RecommendationResponse, QuizRequest, QuizResponse,
+    QuizGradingRequest, QuizGradingResponse,
+)
 
-# --- SMART QUIZ GENERATOR ---
-def generate_smart_questions(module_code: str, difficulty: str):
-    """Generates context-aware questions based on the module code."""
-    topic = module_code.lower()
-    questions = []
-    
-    # KNOWLEDGE BASE SIMULATION
-    # In a real system, this would query an LLM (OpenAI/Gemini) or a Vector Database
-    
-    # 1. DEVOPS / CLOUD / MICROSERVICES
-    if any(k in topic for k in ["devops", "ci/cd", "docker", "k8s", "kubernetes", "cloud", "microservice"]):
-        questions = [
-            {
-                "id": 101,
-                "question": "Quel est le principe clé de DevOps ?",
-                "options": ["Séparer Dev et Ops", "Collaboration et Automatisation", "Ignorer les tests", "Coder en production"],
-                "correctAnswer": 1
-            },
-            {
-                "id": 102,
-                "question": "Quel outil est un standard pour la conteneurisation ?",
-                "options": ["VirtualBox", "Docker", "Vagrant", "VMware"],
-                "correctAnswer": 1
-            },
-            {
-                "id": 103,
-                "question": "Dans Kubernetes, quelle est la plus petite unité déployable ?",
-                "options": ["Le Pod", "Le Node", "Le Service", "Le Container"],
-                "correctAnswer": 0
-            },
-            {
-                "id": 104,
-                "question": "Que signifie CI dans CI/CD ?",
-                "options": ["Code Intelligent", "Continuous Integration", "Cloud Instance", "Cyber Internet"],
-                "correctAnswer": 1
-            },
-             {
-                "id": 105,
-                "question": "Quelle commande Docker liste les conteneurs actifs ?",
-                "options": ["docker run", "docker ps", "docker images", "docker build"],
-                "correctAnswer": 1
-            }
-        ]
-        
-    # 2. JAVA / SPRING BOOT
-    elif any(k in topic for k in ["java", "spring", "jee", "backend"]):
-         questions = [
-            {
-                "id": 201,
-                "question": "Quelle annotation définit un Bean de Service dans Spring ?",
-                "options": ["@Component", "@Service", "@Controller", "@Bean"],
-                "correctAnswer": 1
-            },
-            {
-                "id": 202,
-                "question": "Quel est le cycle de vie par défaut d'un Bean Spring ?",
-                "options": ["Prototype", "Singleton", "Session", "Request"],
-                "correctAnswer": 1
-            },
-            {
-                "id": 203,
-                "question": "En Java, 'String' est-il un type primitif ?",
-                "options": ["Oui", "Non, c'est un Objet", "Ça dépend de la JVM", "Uniquement en Java 8"],
-                "correctAnswer": 1
-            },
-            {
-                "id": 204,
-                "question": "Comment démarrer une application Spring Boot ?",
-                "options": ["java -jar app.jar", "python app.py", "npm start", "spring start"],
-                "correctAnswer": 0
-            },
-            {
-                "id": 205,
-                "question": "Quelle interface de JPA permet les opérations CRUD ?",
-                "options": ["CrudRepository", "SqlRepository", "DbInterface", "JpaManager"],
-                "correctAnswer": 0
-            }
-        ]
-
-    # 3. FALLBACK GENERAL
-    else:
-        # Fallback General Questions
-        questions = [
-            {
-                "id": 901,
-                "question": "Quelle étape est cruciale dans ce module ?",
-                "options": ["L'analyse", "Le sommeil", "L'oubli", "Le hasard"],
-                "correctAnswer": 0
-            },
-            {
-                "id": 902,
-                "question": "Ce concept est-il fondamental ?",
-                "options": ["Non", "Oui", "Peut-être", "Jamais"],
-                "correctAnswer": 1
-            },
-            {
-                "id": 903,
-                "question": "Quel est le but final ?",
-                "options": ["L'échec", "La réussite", "L'abandon", "La pause"],
-                "correctAnswer": 1
-            }
-        ]
-        
-    return questions
-
-@app.post("/generate_quiz", response_model=QuizResponse)
-async def generate_quiz(request: QuizRequest):
-    """Generates an AI-powered quiz for a given module."""
-    print(f"🤖 AI GENERATION: Quiz for {request.module_code} ({request.difficulty})")
-    
-    questions = generate_smart_questions(request.module_code, request.difficulty)
-    
-    return {
-        "module_code": request.module_code,
-        "questions": questions
-    }
+from .cohort import iter_cohort_ndjson
 from .data_service import DataService
+from .grading import answer_key, answer_matrix, grade_matrix, grading_payload, invalid_answer_columns, option_counts
+from .ingestion import EventIngestor
 from .config import settings
+from .scoring import RISK_LEVELS, heuristic_proba, heuristic_proba_batch, risk_level, risk_levels, round2
+from .libs import fast_json
+from .libs.api_bridge import ApiBridge
+from .libs.auth import ClaimsCache, InvalidToken, TokenVerifier
+from .libs.batcher import BatcherOverloaded, MicroBatcher
+from .libs.conditional import etag_matches, make_etag, not_modified, set_validators
+from .libs.metrics import METRICS, PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, TimedJSONResponse
+from .libs.prediction_cache import PredictionCache
+from .libs.single_flight import SingleFlight
+from .quiz_bank import DEFAULT_QUIZ_BANK_PATH, QuizBank
+from .recommender import CollaborativeRecommender
+from .risk_matrix import RiskMatrix
+from .risk_stream import RiskBroadcaster
+from .student_knn import StudentKnnIndex
 
-app = FastAPI(title="AIService", description="AI Service for Learning Analytics Platform", version="1.0.0")
+app = FastAPI(
+    title="AIService",
+    description="AI Service for Learning Analytics Platform",
+    version="1.0.0",
+    default_response_class=TimedJSONResponse,
+)
 
 # CORS Configuration
 app.add_middleware(
@@ -134,49 +48,451 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms, in-flight and status counters (outermost middleware)
+METRICS.spans_enabled = settings.metrics_enabled and settings.metrics_spans_enabled
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, registry=METRICS)
+
+# Bearer JWT authentication on every route that reads student data or writes data (off by default).
+# Verified claims are cached per token digest until "exp", so repeat tokens skip the signature check
+token_verifier = TokenVerifier(
+    settings.jwt_secret_key,
+    settings.jwt_algorithm,
+    ClaimsCache(settings.auth_cache_max_entries, settings.auth_cache_max_ttl_seconds)
+    if settings.auth_cache_enabled else None,
+)
+bearer_scheme = HTTPBearer(auto_error=False)
+
+async def authenticate(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)):
+    """Claims of the request's bearer token (None when authentication is disabled)."""
+    if not settings.auth_enabled:
+        return None
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return token_verifier.verify(credentials.credentials)
+    except InvalidToken:
+        raise HTTPException(status_code=401, detail="Invalid or expired token",
+                            headers={"WWW-Authenticate": 'Bearer error="invalid_token"'})
+
+async def require_admin(claims: Optional[dict] = Depends(authenticate)):
+    """Admin routes: the token's "role" claim must be ``auth_admin_role`` (open when authentication is disabled)."""
+    if claims is not None and claims.get("role") != settings.auth_admin_role:
+        raise HTTPException(status_code=403, detail="Admin role required")
+    return claims
+
+# Cache of /predict responses, keyed by the version of the student's last change.
+# A student update drops that student's entries only
+prediction_cache = PredictionCache(
+    max_entries=settings.prediction_cache_max_entries,
+    ttl_seconds=settings.prediction_cache_ttl_seconds,
+) if settings.prediction_cache_enabled else None
+if prediction_cache is not None:
+    DataService.get_student_store().add_listener(
+        lambda student_id, row: prediction_cache.invalidate_student(student_id))
+
+# Identical concurrent /predict and /reco computations run once and share the result
+request_flight = SingleFlight() if settings.single_flight_enabled else None
+
+def heuristic_prediction(student_id: int, module_code: str) -> Optional[dict]:
+    """``/predict`` result for one pair, None if the student or module is unknown."""
+    student = DataService.get_student(student_id)
+    module = DataService.get_module(module_code)
+    if not student or not module:
+        return None
+    
+    # Simple heuristic-based prediction for demo purposes
+    # Higher scores and more study hours lead to higher success probability
+    final_proba = heuristic_proba(student["avg_score"], student["study_hours_per_week"])
+    
+    return {
+        "student_id": student_id,
+        "module_code": module_code,
+        "success_proba": round(final_proba, 2),
+        "risk_level": risk_level(final_proba),
+        "message": f"Prediction for {student['name']} in {module['name']}"
+    }
+
+def score_pairs(pairs):
+    """Heuristic predictions for ``PredictionRequest`` pairs, in order.
+    
+    Same values as ``/predict``, computed in one vectorized pass.
+    """
+    # One lookup per distinct student/module, not per pair
+    students = {sid: DataService.get_student(sid) for sid in {p.student_id for p in pairs}}
+    modules = {code: DataService.get_module(code) for code in {p.module_code for p in pairs}}
+    
+    if not all(students.values()) or not all(modules.values()):
+        raise HTTPException(status_code=404, detail="Student or Module not found")
+    
+    features = DataService.get_student_store().features(
+        [p.student_id for p in pairs], ("avg_score", "study_hours_per_week")
+    )
+    final_proba = heuristic_proba_batch(features[:, 0], features[:, 1])
+    success_proba = round2(final_proba).tolist()
+    risk = risk_levels(final_proba).tolist()
+    
+    return [
+        {
+            "student_id": p.student_id,
+            "module_code": p.module_code,
+            "success_proba": success_proba[i],
+            "risk_level": risk[i],
+            "message": f"Prediction for {students[p.student_id]['name']} in {modules[p.module_code]['name']}"
+        }
+        for i, p in enumerate(pairs)
+    ]
+
+# Precomputed student x module probabilities, kept current on student updates
+risk_matrix = RiskMatrix(DataService.get_student_store(), list(DataService.get_all_modules()))
+
+# Running per-student aggregates from activity events, merged into the stored metrics (replays the log on start)
+event_ingestor = EventIngestor(settings.ingestion_log_path or None, DataService.get_student_store(),
+                               settings.ingestion_baseline_weight)
+
+# Optional micro-batching of concurrent /predict calls
+predict_batcher = MicroBatcher(
+    score_pairs,
+    max_batch_size=settings.batch_max_size,
+    max_delay_ms=settings.batch_max_delay_ms,
+    max_queue=settings.batch_max_queue,
+) if settings.predict_batching_enabled else None
+
+# Push of prediction changes to SSE subscribers (GET /risk/stream), fed by student updates
+# and scored like /predict
+risk_broadcaster = RiskBroadcaster(
+    heuristic_prediction,
+    min_delta=settings.risk_stream_min_delta,
+    max_subscriptions=settings.risk_stream_max_subscriptions,
+    keepalive_seconds=settings.risk_stream_keepalive_seconds,
+)
+DataService.get_student_store().add_listener(risk_broadcaster.on_student_updated)
+
+# Model-backed predictions: the model loads in the background and is hot-swapped on new artifacts.
+# Real-time predictions read the stored metrics events were merged into; recommendations are
+# the /reco ones (defined below): similar students first, then topic matches
+api_bridge = ApiBridge(metrics_source=event_ingestor.published_metrics,
+                       recommendation_source=lambda *args: bridge_recommendations(*args))
+
+@app.on_event("shutdown")
+async def stop_batchers():
+    if predict_batcher is not None:
+        await predict_batcher.stop()
+    event_ingestor.close()
+    api_bridge.models.close()
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
-    return {"status": "ok"}
+    """Health check endpoint.
+    
+    ``/predict`` and the ``/risk`` endpoints score with the heuristic;
+    ``api_bridge_model`` is the readiness and version of the ApiBridge model.
+    """
+    return {"status": "ok", "predict_source": "heuristic", "api_bridge_model": api_bridge.models.status()}
 
-@app.post("/predict", response_model=PredictionResponse)
+@app.post("/admin/model/reload", status_code=202, dependencies=[Depends(require_admin)])
+async def reload_model():
+    """Load the current ApiBridge model artifact in the background and swap it in once warmed up."""
+    started = api_bridge.models.reload()
+    return {"reload_started": started, "api_bridge_model": api_bridge.models.status()}
+
+@app.post("/predict", response_model=PredictionResponse, dependencies=[Depends(authenticate)])
 async def predict(request: PredictionRequest):
     """Predict student success probability."""
-    student = DataService.get_student(request.student_id)
-    module = DataService.get_module(request.module_code)
+    version = DataService.get_student_store().student_version(request.student_id)
+    if prediction_cache is not None:
+        cached = prediction_cache.get(request.student_id, request.module_code, version)
+        if cached is not None:
+            return cached
     
-    if not student or not module:
-        raise HTTPException(status_code=404, detail="Student or Module not found")
+    if predict_batcher is not None:
+        try:
+            if request_flight is not None:
+                # Identical requests queued together take one batch slot
+                key = ("predict", request.student_id, request.module_code, version)
+                result = await request_flight.do(key, lambda: predict_batcher.submit(request))
+            else:
+                result = await predict_batcher.submit(request)
+        except BatcherOverloaded:
+            raise HTTPException(status_code=503, detail="Prediction queue full", headers={"Retry-After": "1"})
+    else:
+        result = heuristic_prediction(request.student_id, request.module_code)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Student or Module not found")
+    if prediction_cache is not None:
+        prediction_cache.put(request.student_id, request.module_code, version, result)
+    return result
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse, dependencies=[Depends(authenticate)])
+async def predict_batch(request: BatchPredictionRequest):
+    """Predict success probability for many (student, module) pairs at once.
+
+    Uses the same heuristic as ``/predict`` evaluated in one vectorized pass;
+    predictions are returned in request order.
+    """
+    pairs = request.pairs
+    if len(pairs) > settings.predict_batch_max_pairs:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(pairs)} pairs (max {settings.predict_batch_max_pairs})"
+        )
     
-    # Simple heuristic-based prediction for demo purposes
-    # Higher scores and more study hours lead to higher success probability
-    base_proba = student["avg_score"] / 100.0
-    study_bonus = min(student["study_hours_per_week"] / 40.0, 0.2)
-    final_proba = min(base_proba + study_bonus, 1.0)
+    return {"predictions": score_pairs(pairs)}
+
+@app.get("/predict/cohort/stream", dependencies=[Depends(authenticate)])
+async def stream_cohort_predictions(
+    module_codes: Optional[List[str]] = Query(None, description="Modules to score (default: all)"),
+    student_ids: Optional[List[int]] = Query(None, description="Students to score (default: all)"),
+    risk_level: Optional[List[str]] = Query(None, description="Only emit these risk levels"),
+    cursor: int = Query(0, ge=0, description="Resume position from a previous stream"),
+    chunk_size: int = Query(settings.cohort_stream_chunk_size, ge=1, le=100000),
+):
+    """Stream predictions for every student × module pair as NDJSON.
+    
+    Rows are scored chunk by chunk with the ``/predict`` heuristic and written as
+    they are produced. Every row carries the ``cursor`` to resume after it; the
+    stream ends with ``{"end": true, "cursor": <total>}``.
+    """
+    modules = module_codes or list(DataService.get_all_modules())
+    if risk_level and not set(risk_level) <= set(RISK_LEVELS):
+        raise HTTPException(status_code=422, detail=f"risk_level must be one of {list(RISK_LEVELS)}")
+    
+    store = DataService.get_student_store()
+    n_students = len(student_ids) if student_ids else len(store)
+    if cursor > n_students * len(modules):
+        raise HTTPException(status_code=400, detail="Cursor is past the end of the cohort")
+    
+    return StreamingResponse(
+        iter_cohort_ndjson(store, modules, student_ids, risk_level, cursor, chunk_size),
+        media_type="application/x-ndjson",
+    )
+
+@app.get("/risk/stream", dependencies=[Depends(authenticate)])
+async def stream_risk_updates(
+    student_ids: List[int] = Query(..., description="Students to watch"),
+    module_codes: List[str] = Query(..., description="Modules to watch for each student"),
+):
+    """Server-Sent Events stream of predictions for every student × module pair.
     
-    risk_level = "Low" if final_proba > 0.8 else "Medium" if final_proba > 0.6 else "High"
+    The current prediction of each pair is sent first. After that a new
+    ``prediction`` event is pushed only when the pair's ``risk_level`` changes
+    or its ``success_proba`` moves by at least ``risk_stream_min_delta``.
+    """
+    n_pairs = len(set(student_ids)) * len(set(module_codes))
+    if n_pairs > settings.risk_stream_max_pairs:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many pairs: {n_pairs} (max {settings.risk_stream_max_pairs})"
+        )
+    if risk_broadcaster.full:
+        raise HTTPException(status_code=503, detail="Too many subscriptions", headers={"Retry-After": "5"})
     
+    pairs = [(sid, code) for sid in student_ids for code in module_codes]
+    return StreamingResponse(
+        risk_broadcaster.stream(pairs),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/risk/stream/stats")
+async def risk_stream_stats():
+    """Subscriptions and push counters of /risk/stream."""
+    return risk_broadcaster.stats()
+
+RISK_ORDERS = ("highest_risk", "lowest_risk")
+
+def _risk_entries(ranked, key):
+    return [{key: label, "success_proba": proba, "risk_level": risk} for label, proba, risk in ranked]
+
+@app.get("/risk/modules/{module_code}/top", response_model=RiskRankingResponse, response_model_exclude_none=True,
+         dependencies=[Depends(authenticate)])
+async def top_students_at_risk(module_code: str, n: int = Query(20, ge=1, le=1000),
+                               order: str = Query("highest_risk", enum=list(RISK_ORDERS))):
+    """Top-N highest-risk (or lowest-risk) students of a module."""
+    if not risk_matrix.has_module(module_code):
+        raise HTTPException(status_code=404, detail="Module not found")
+    ranked = risk_matrix.top_students(module_code, n, highest_risk=order == "highest_risk")
+    return {"module_code": module_code, "order": order, "entries": _risk_entries(ranked, "student_id")}
+
+@app.get("/risk/students/{student_id}/top", response_model=RiskRankingResponse, response_model_exclude_none=True,
+         dependencies=[Depends(authenticate)])
+async def top_modules_at_risk(student_id: int, n: int = Query(5, ge=1, le=1000),
+                              order: str = Query("highest_risk", enum=list(RISK_ORDERS))):
+    """A student's riskiest (or safest) modules."""
+    try:
+        ranked = risk_matrix.top_modules(student_id, n, highest_risk=order == "highest_risk")
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return {"student_id": student_id, "order": order, "entries": _risk_entries(ranked, "module_code")}
+
+@app.get("/risk/modules/{module_code}/histogram", response_model=RiskHistogramResponse,
+         dependencies=[Depends(authenticate)])
+async def module_risk_histogram(module_code: str, bins: int = Query(10, ge=1, le=100)):
+    """Distribution of success probabilities and risk levels in a module."""
+    if not risk_matrix.has_module(module_code):
+        raise HTTPException(status_code=404, detail="Module not found")
+    summary = risk_matrix.histogram(module_code, bins)
     return {
-        "student_id": request.student_id,
-        "module_code": request.module_code,
-        "success_proba": round(final_proba, 2),
-        "risk_level": risk_level,
-        "message": f"Prediction for {student['name']} in {module['name']}"
+        "module_code": module_code,
+        "students": len(risk_matrix),
+        "mean_success_proba": summary["mean"],
+        "bin_edges": summary["bin_edges"],
+        "counts": summary["counts"],
+        "risk_counts": summary["risk_counts"],
     }
 
-@app.get("/reco/{student_id}/{module_code}", response_model=RecommendationResponse)
-async def get_recommendations(student_id: int, module_code: str):
-    """Get personalized learning recommendations."""
+@app.post("/events", response_model=IngestResponse, dependencies=[Depends(require_admin)])
+async def ingest_events(batch: EventBatch):
+    """Ingest activity events and update the students' running aggregates."""
+    return event_ingestor.ingest(event.model_dump() for event in batch.events)
+
+@app.get("/students/{student_id}/aggregates", dependencies=[Depends(authenticate)])
+async def student_aggregates(student_id: int):
+    """Metrics aggregated from a student's activity events."""
+    metrics = event_ingestor.aggregates(student_id)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="No events for this student")
+    return {"student_id": student_id, **metrics}
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Metrics in the Prometheus text exposition format."""
+        return Response(content=METRICS.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss/eviction counters of the prediction cache."""
+    return {"predict": prediction_cache.stats() if prediction_cache is not None else None}
+
+@app.get("/responses/stats")
+async def response_cache_stats():
+    """Hit rate of the encoded response-body cache."""
+    return {"json_encoder": "orjson" if fast_json.orjson is not None else "json",
+            "strict_validation": settings.strict_response_validation,
+            "body_cache": response_body_cache.stats()}
+
+@app.get("/batcher/stats")
+async def batcher_stats():
+    """Queue depth and batch-size metrics of the /predict micro-batcher."""
+    return {"predict": predict_batcher.stats() if predict_batcher is not None else None}
+
+@app.get("/auth/stats")
+async def auth_stats():
+    """Token verifications and hit rate of the verified-claims cache."""
+    return {"enabled": settings.auth_enabled, **token_verifier.stats()}
+
+@app.get("/singleflight/stats")
+async def single_flight_stats():
+    """How many /predict and /reco calls were coalesced onto an in-flight computation."""
+    return request_flight.stats() if request_flight is not None else None
+
+# Encoded response bodies of hot read endpoints (used unless strict validation is on)
+response_body_cache = fast_json.BodyCache(settings.response_cache_max_entries)
+
+# Similar-student index and "helpful resource" votes for collaborative recommendations
+student_knn = StudentKnnIndex(
+    DataService.get_student_store(),
+    exact_max_students=settings.knn_exact_max_students,
+    n_probe=settings.knn_probe_cells,
+)
+recommender = CollaborativeRecommender(student_knn, DataService.get_resource_index(), settings.reco_neighbours)
+
+@app.post("/reco/feedback", dependencies=[Depends(authenticate)])
+async def record_resource_feedback(feedback: ResourceFeedback):
+    """Record whether a resource helped a student."""
+    if DataService.get_resource_index().get(feedback.resource_id) is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    recommender.record_feedback(feedback.student_id, feedback.resource_id, feedback.helpful)
+    return {"status": "recorded"}
+
+@app.get("/reco/{student_id}/{module_code}", response_model=RecommendationResponse, dependencies=[Depends(authenticate)])
+async def get_recommendations(student_id: int, module_code: str, response: Response,
+                              limit: int = Query(5, ge=1, le=50),
+                              if_none_match: Optional[str] = Header(None)):
+    """Get personalized learning recommendations.
+    
+    Resources that helped similar students come first, then topic matches.
+    Supports ``If-None-Match`` with an ETag stamped from the data versions.
+    """
     student = DataService.get_student(student_id)
     module = DataService.get_module(module_code)
     
     if not student or not module:
         raise HTTPException(status_code=404, detail="Student or Module not found")
     
-    resources = DataService.get_resources_for_module(module_code)
+    etag = None
+    if settings.etag_enabled:
+        # Similar students only matter once feedback exists; then any student change may alter them
+        neighbours_stamp = DataService.get_student_store().version if recommender.has_feedback else 0
+        etag = make_etag("r", DataService.get_catalog_stamp(), recommender.version, neighbours_stamp)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, settings.reco_cache_control)
+        set_validators(response, etag, settings.reco_cache_control)
     
     recommendations = []
-    for res in resources:
+    if recommender.has_feedback:
+        if request_flight is not None:
+            # Neighbour search runs off the event loop, once per identical in-flight request
+            key = ("reco", student_id, module_code, limit, recommender.version,
+                   DataService.get_student_store().version)
+            recommendations = await request_flight.do(key, lambda: run_in_threadpool(
+                _collaborative_recommendations, student_id, module["topics"], limit))
+        else:
+            recommendations = _collaborative_recommendations(student_id, module["topics"], limit)
+    
+    if not settings.strict_response_validation:
+        # Trusted internal data: send pre-encoded bytes, skipping response_model validation
+        if not recommendations:
+            # Topic-only lists are the same for every student: cache their encoded form
+            key = (module_code, limit, DataService.get_resource_index().version)
+            fragment = response_body_cache.get(key)
+            if fragment is None:
+                fragment = fast_json.dumps(_topic_recommendations(module_code, limit, []))
+                response_body_cache.put(key, fragment)
+        else:
+            fragment = fast_json.dumps(_topic_recommendations(module_code, limit, recommendations))
+        body = fast_json.json_response(
+            b'{"student_id":%d,"module_code":%s,"recommendations":%s}'
+            % (student_id, fast_json.dumps(module_code), fragment)
+        )
+        return set_validators(body, etag, settings.reco_cache_control) if etag else body
+    
+    return {
+        "student_id": student_id,
+        "module_code": module_code,
+        "recommendations": _topic_recommendations(module_code, limit, recommendations)
+    }
+
+def _collaborative_recommendations(student_id: int, topics: List[str], limit: int) -> List[dict]:
+    return [
+        {
+            "resource_id": res["resource_id"],
+            "title": res["title"],
+            "url": res["url"],
+            "type": res["type"],
+            "reason": f"Helped {n_students} similar student{'s' if n_students > 1 else ''}"
+        }
+        for res, n_students in recommender.recommend(student_id, topics, limit)
+    ]
+
+def bridge_recommendations(student_id: int, module_code: str, limit: int = 5) -> List[dict]:
+    """``/reco`` recommendations for ``ApiBridge.get_recommendations``."""
+    module = DataService.get_module(module_code)
+    recommendations = []
+    if recommender.has_feedback:
+        recommendations = _collaborative_recommendations(student_id, module["topics"], limit)
+    return _topic_recommendations(module_code, limit, recommendations)
+
+def _topic_recommendations(module_code: str, limit: int, recommendations: List[dict]) -> List[dict]:
+    """``recommendations`` filled up to ``limit`` with topic matches not already in it."""
+    recommendations = list(recommendations)  # may be shared by coalesced requests
+    seen = {rec["resource_id"] for rec in recommendations}
+    for res in DataService.get_resources_for_module(module_code, limit):
+        if len(recommendations) == limit:
+            break
+        if res["resource_id"] in seen:
+            continue
         recommendations.append({
             "resource_id": res["resource_id"],
             "title": res["title"],
@@ -184,13 +500,85 @@ async def get_recommendations(student_id: int, module_code: str):
             "type": res["type"],
             "reason": f"Recommended based on topics in {module_code}"
         })
+    return recommendations
+
+
+# --- SMART QUIZ GENERATOR ---
+# KNOWLEDGE BASE: compiled once from app/data/quiz_bank.json
+# In a real system, this would query an LLM (OpenAI/Gemini) or a Vector Database
+quiz_bank = QuizBank.load(settings.quiz_bank_path or DEFAULT_QUIZ_BANK_PATH, settings.quiz_questions_per_quiz)
+
+def generate_smart_questions(module_code: str, difficulty: str):
+    """Generates context-aware questions based on the module code and difficulty."""
+    return quiz_bank.questions(module_code, difficulty)
+
+@app.post("/generate_quiz", response_model=QuizResponse, dependencies=[Depends(authenticate)])
+async def generate_quiz(request: QuizRequest):
+    """Generates an AI-powered quiz for a given module."""
+    print(f"🤖 AI GENERATION: Quiz for {request.module_code} ({request.difficulty})")
+    
+    # Quizzes are assembled from pre-serialized question bytes
+    if not settings.strict_response_validation:
+        return fast_json.json_response(quiz_bank.serialized_response(request.module_code, request.difficulty))
+    
+    questions = generate_smart_questions(request.module_code, request.difficulty)
     
     return {
-        "student_id": student_id,
-        "module_code": module_code,
-        "recommendations": recommendations
+        "module_code": request.module_code,
+        "questions": questions
     }
 
+@app.get("/generate_quiz", response_model=QuizResponse, dependencies=[Depends(authenticate)])
+async def get_quiz(response: Response, module_code: str, difficulty: str = "Medium",
+                   if_none_match: Optional[str] = Header(None)):
+    """Cacheable variant of ``POST /generate_quiz``.
+    
+    Fixed quizzes carry an ETag stamped from the question bank version, so
+    reloads are answered with ``304``; sampled quizzes are never cached.
+    """
+    stamp = quiz_bank.fixed_quiz_stamp(module_code, difficulty) if settings.etag_enabled else None
+    if stamp is None:
+        cache_control = "no-store"
+        etag = None
+    else:
+        cache_control = settings.quiz_cache_control
+        etag = make_etag("q", stamp)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, cache_control)
+    
+    result = await generate_quiz(QuizRequest(module_code=module_code, difficulty=difficulty))
+    # The fast path returns a ready Response, the strict path a dict to validate
+    target = result if isinstance(result, Response) else response
+    target.headers["Cache-Control"] = cache_control
+    if etag is not None:
+        target.headers["ETag"] = etag
+    return result
+
+
+# --- QUIZ GRADING ---
+# Authoritative server-side scores: the Frontend still grades locally for instant
+# feedback, teachers bulk-review submissions with the scores and item statistics below
 
-# AI-powered quiz grading moved to Frontend for better performance
-# Local grading ensures instant feedback without network latency
+@app.post("/grade_quiz", response_model=QuizGradingResponse, dependencies=[Depends(authenticate)])
+async def grade_quiz(request: QuizGradingRequest):
+    """Grade many submissions of a generated quiz against its answer keys.
+    
+    Returns per-student scores plus each question's difficulty (p-value) and
+    discrimination (corrected point-biserial).
+    """
+    questions = [quiz_bank.question(qid) for qid in request.question_ids]
+    unknown = [qid for qid, q in zip(request.question_ids, questions) if q is None]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown question id(s): {unknown[:10]}")
+    
+    answers = answer_matrix(request.answers)
+    invalid = [request.question_ids[j] for j in invalid_answer_columns(answers, option_counts(questions))]
+    if invalid:
+        raise HTTPException(status_code=422, detail=f"Answer past the last option for question id(s): {invalid[:10]}")
+    
+    result = grade_matrix(answers, answer_key(questions))
+    payload = grading_payload(request.student_ids, request.question_ids, result)
+    
+    if not settings.strict_response_validation:
+        return fast_json.json_response(fast_json.dumps(payload))
+    return payload
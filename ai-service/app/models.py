@@ -1,6 +1,6 @@
 """Pydantic models for API requests and responses."""
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Dict, List, Literal, Optional
 
 
 class PredictionRequest(BaseModel):
@@ -20,6 +20,75 @@ class PredictionResponse(BaseModel):
     message: str = Field(..., description="Human-readable message about the prediction")
 
 
+class BatchPredictionRequest(BaseModel):
+    """Request model for batch prediction endpoint."""
+    
+    pairs: List[PredictionRequest] = Field(..., description="(student_id, module_code) pairs to score")
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response model for batch prediction endpoint."""
+    
+    predictions: List[PredictionResponse] = Field(..., description="Predictions in request order")
+
+
+class RiskEntry(BaseModel):
+    """One ranked entry of a risk query."""
+    
+    student_id: Optional[int] = None
+    module_code: Optional[str] = None
+    success_proba: float
+    risk_level: str
+
+
+class RiskRankingResponse(BaseModel):
+    """Response model for top-N at-risk queries."""
+    
+    student_id: Optional[int] = None
+    module_code: Optional[str] = None
+    order: str = Field(..., description="highest_risk or lowest_risk")
+    entries: List[RiskEntry]
+
+
+class RiskHistogramResponse(BaseModel):
+    """Response model for per-module risk histograms."""
+    
+    module_code: str
+    students: int
+    mean_success_proba: float
+    bin_edges: List[float]
+    counts: List[int]
+    risk_counts: Dict[str, int]
+
+
+class ActivityEvent(BaseModel):
+    """A raw student activity event."""
+    
+    event_id: str = Field(..., description="Unique event ID; re-sent events are ignored")
+    student_id: int
+    type: Literal["assessment_submitted", "assessment_missed", "session_attended", "session_missed", "forum_post"]
+    score: Optional[float] = Field(None, ge=0, le=100, description="Score (0-100), required for assessment_submitted")
+    
+    @model_validator(mode="after")
+    def check_score(self):
+        if self.type == "assessment_submitted" and self.score is None:
+            raise ValueError("assessment_submitted events require a score")
+        return self
+
+
+class EventBatch(BaseModel):
+    """Request model for event ingestion."""
+    
+    events: List[ActivityEvent]
+
+
+class IngestResponse(BaseModel):
+    """Response model for event ingestion."""
+    
+    accepted: int = Field(..., description="Events applied")
+    duplicates: int = Field(..., description="Events skipped because their ID was already seen")
+
+
 class Recommendation(BaseModel):
     """Model for a single recommendation."""
     
@@ -30,6 +99,14 @@ class Recommendation(BaseModel):
     reason: str = Field(..., description="Reason why this resource is recommended")
 
 
+class ResourceFeedback(BaseModel):
+    """Request model for resource feedback."""
+    
+    student_id: int
+    resource_id: str
+    helpful: bool = Field(True, description="Whether the resource helped the student")
+
+
 class RecommendationResponse(BaseModel):
     """Response model for recommendations endpoint."""
     
@@ -38,8 +115,61 @@ class RecommendationResponse(BaseModel):
     recommendations: List[Recommendation] = Field(..., description="List of personalized recommendations")
 
 
-# Note: Grading models removed to match official OpenAPI spec
-# Use local grading in Frontend for immediate response
+# Upper bound on answer indexes, before the per-question option count is known
+MAX_OPTION_INDEX = 255
+
+
+class QuizGradingRequest(BaseModel):
+    """Request model for batch quiz grading.
+    
+    ``answers`` holds one row per student, in ``student_ids`` order, with the
+    chosen option index for each question of ``question_ids`` (-1 = unanswered).
+    """
+    
+    question_ids: List[int] = Field(..., min_length=1, description="Questions of the quiz, in answer order")
+    student_ids: List[int] = Field(..., min_length=1)
+    answers: List[List[Annotated[int, Field(ge=-1, le=MAX_OPTION_INDEX)]]] = Field(
+        ..., description="Chosen option index per question (-1 = unanswered)"
+    )
+    
+    @model_validator(mode="after")
+    def check_shape(self):
+        if len(self.answers) != len(self.student_ids):
+            raise ValueError("answers must have one row per student")
+        n_questions = len(self.question_ids)
+        if any(len(row) != n_questions for row in self.answers):
+            raise ValueError("each answers row must have one entry per question")
+        return self
+
+
+class StudentScore(BaseModel):
+    """Grade of one submission."""
+    
+    student_id: int
+    correct: int
+    score: float = Field(..., description="Percentage of correct answers (0-100)")
+
+
+class QuestionStats(BaseModel):
+    """Item statistics of one question over the graded submissions."""
+    
+    question_id: int
+    p_value: float = Field(..., description="Share of students answering correctly (difficulty index)")
+    discrimination: Optional[float] = Field(
+        None, description="Corrected point-biserial: correlation of the item with the rest score"
+    )
+    unanswered: float = Field(..., description="Share of students who skipped the question")
+
+
+class QuizGradingResponse(BaseModel):
+    """Response model for batch quiz grading."""
+    
+    n_submissions: int
+    n_questions: int
+    mean_score: float
+    scores: List[StudentScore]
+    questions: List[QuestionStats]
+
 
 class QuizRequest(BaseModel):
     """Request model for quiz generation."""
@@ -0,0 +1,199 @@
+"""Compiled quiz knowledge base.
+
+The question bank is loaded once from ``app/data/quiz_bank.json`` into an
+immutable structure:
+
+- topic families are detected with a single Aho–Corasick pass over the
+  lower-cased module code (the first family in file order wins, as the old
+  if/elif chain did);
+- questions are pre-bucketed by ``(family, difficulty)`` so a quiz is an O(k)
+  sample;
+- quizzes whose content is fixed (the bucket holds no more than ``k``
+  questions) are pre-serialized to JSON bytes.
+"""
+import hashlib
+import json
+import os
+import random
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+DEFAULT_QUIZ_BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "quiz_bank.json")
+
+DIFFICULTIES = ("Easy", "Medium", "Hard")
+DEFAULT_DIFFICULTY = "Medium"
+
+
+def normalize_difficulty(difficulty: Optional[str]) -> str:
+    """Canonical difficulty label; unknown values map to ``Medium``."""
+    label = (difficulty or "").strip().capitalize()
+    return label if label in DIFFICULTIES else DEFAULT_DIFFICULTY
+
+
+def dump_json(value) -> bytes:
+    """Compact JSON bytes, encoded like Starlette's ``JSONResponse``."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton mapping keywords to integer priorities.
+
+    :meth:`best` scans a text once and returns the lowest priority among all
+    keywords occurring in it.
+    """
+
+    def __init__(self, keywords: Mapping[str, int]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Optional[int]] = [None]
+
+        for keyword, priority in keywords.items():
+            node = 0
+            for char in keyword:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                node = nxt
+            self._out[node] = priority if self._out[node] is None else min(self._out[node], priority)
+
+        # Breadth-first failure links; fold each suffix's output into the node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                suffix_out = self._out[self._fail[child]]
+                if suffix_out is not None and (self._out[child] is None or suffix_out < self._out[child]):
+                    self._out[child] = suffix_out
+
+    def best(self, text: str) -> Optional[int]:
+        """Lowest priority of any keyword found in ``text``, or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        best = None
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = out[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
+
+
+class QuizBank:
+    """Immutable, pre-indexed question bank."""
+
+    def __init__(self, data: Mapping, questions_per_quiz: int = 5):
+        self.version = data.get("version", 1)
+        # Content stamp: changes with any edit of the bank, even without a version bump
+        self.fingerprint = hashlib.sha1(dump_json(data)).hexdigest()[:8]
+        self.questions_per_quiz = questions_per_quiz
+        self.families: Tuple[str, ...] = tuple(family["name"] for family in data["families"])
+        self.default_family: str = data.get("default_family", self.families[-1])
+
+        keywords: Dict[str, int] = {}
+        for priority, family in enumerate(data["families"]):
+            for keyword in family.get("keywords", ()):
+                keywords.setdefault(keyword.lower(), priority)
+        self._matcher = KeywordMatcher(keywords)
+
+        # Per (family, difficulty): questions at that level, and the fixed pool
+        # (same level first, then nearest levels) used when there are too few
+        self._buckets: Dict[Tuple[str, str], Tuple[Mapping, ...]] = {}
+        self._pools: Dict[Tuple[str, str], Tuple[Mapping, ...]] = {}
+        self._serialized: Dict[Tuple[str, str], bytes] = {}
+        for family in data["families"]:
+            questions = tuple(
+                MappingProxyType({
+                    "id": q["id"],
+                    "question": q["question"],
+                    "options": tuple(q["options"]),
+                    "correctAnswer": q["correctAnswer"],
+                })
+                for q in family["questions"]
+            )
+            levels = [normalize_difficulty(q.get("difficulty")) for q in family["questions"]]
+            for difficulty in DIFFICULTIES:
+                key = (family["name"], difficulty)
+                self._buckets[key] = tuple(q for q, level in zip(questions, levels) if level == difficulty)
+                if len(self._buckets[key]) > questions_per_quiz:
+                    continue
+                if len(questions) <= questions_per_quiz:
+                    pool = questions
+                else:
+                    rank = DIFFICULTIES.index(difficulty)
+                    order = sorted(range(len(questions)), key=lambda i: abs(DIFFICULTIES.index(levels[i]) - rank))
+                    pool = tuple(questions[i] for i in order[:questions_per_quiz])
+                self._pools[key] = pool
+                self._serialized[key] = dump_json([self._as_dict(q) for q in pool])
+
+        self._by_id: Dict[int, Mapping] = {
+            q["id"]: q for bucket in self._buckets.values() for q in bucket
+        }
+        # Per-question JSON, joined to serialize sampled quizzes without re-encoding
+        self._question_json: Dict[int, bytes] = {qid: dump_json(self._as_dict(q)) for qid, q in self._by_id.items()}
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_QUIZ_BANK_PATH, questions_per_quiz: int = 5) -> "QuizBank":
+        """Load and compile a question bank file."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), questions_per_quiz)
+
+    @staticmethod
+    def _as_dict(question: Mapping) -> Dict:
+        return {
+            "id": question["id"],
+            "question": question["question"],
+            "options": list(question["options"]),
+            "correctAnswer": question["correctAnswer"],
+        }
+
+    def detect_family(self, module_code: str) -> str:
+        """Topic family for a module code."""
+        priority = self._matcher.best(module_code.lower())
+        return self.families[priority] if priority is not None else self.default_family
+
+    def question(self, question_id: int) -> Optional[Mapping]:
+        """Read-only question (with its answer key) by id."""
+        return self._by_id.get(question_id)
+
+    def questions(self, module_code: str, difficulty: str) -> List[Dict]:
+        """Questions for a quiz: a random sample, or the fixed pool if too few."""
+        key = (self.detect_family(module_code), normalize_difficulty(difficulty))
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = random.sample(self._buckets[key], self.questions_per_quiz)
+        return [self._as_dict(q) for q in pool]
+
+    def fixed_quiz_stamp(self, module_code: str, difficulty: str) -> Optional[str]:
+        """Version stamp of the quiz for a module, or None if it is sampled at random."""
+        key = (self.detect_family(module_code), normalize_difficulty(difficulty))
+        if key not in self._pools:
+            return None
+        return f"{self.version}.{self.fingerprint}.{self.questions_per_quiz}.{key[0]}.{key[1]}"
+
+    def serialized_response(self, module_code: str, difficulty: str) -> bytes:
+        """Complete ``QuizResponse`` JSON body.
+
+        Fixed pools are served from their cached body; sampled quizzes join the
+        pre-encoded questions (same sampling as :meth:`questions`).
+        """
+        key = (self.detect_family(module_code), normalize_difficulty(difficulty))
+        questions = self._serialized.get(key)
+        if questions is None:
+            sample = random.sample(self._buckets[key], self.questions_per_quiz)
+            questions = b"[" + b",".join(self._question_json[q["id"]] for q in sample) + b"]"
+        return b'{"module_code":' + dump_json(module_code) + b',"questions":' + questions + b"}"
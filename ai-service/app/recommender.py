@@ -0,0 +1,76 @@
+"""Collaborative resource recommendations from similar students.
+
+Students mark resources as helpful. For a student and a module, the resources
+that helped the student's nearest neighbours (see :class:`StudentKnnIndex`)
+are scored by the summed similarity of those neighbours, restricted to
+resources sharing a topic with the module.
+
+:meth:`CollaborativeRecommender.recommend` may run in a worker thread while
+feedback is recorded on the event loop: each student's helpful resources are
+a frozenset that feedback replaces, never mutates, so a reader iterates a
+consistent snapshot.
+"""
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from .resource_index import ResourceIndex
+from .student_knn import StudentKnnIndex
+
+
+class CollaborativeRecommender:
+    """Neighbour-weighted "helpful resource" votes."""
+
+    def __init__(self, knn: StudentKnnIndex, resources: ResourceIndex, n_neighbours: int = 25):
+        self.knn = knn
+        self.resources = resources
+        self.n_neighbours = n_neighbours
+        self._helpful: Dict[int, FrozenSet[str]] = {}
+        # Bumped whenever the recorded feedback changes
+        self.version = 0
+
+    @property
+    def has_feedback(self) -> bool:
+        return bool(self._helpful)
+
+    def record_feedback(self, student_id: int, resource_id: str, helpful: bool = True):
+        """Record whether a resource helped a student."""
+        resources = self._helpful.get(student_id, frozenset())
+        if helpful == (resource_id in resources):
+            return
+        resources = resources | {resource_id} if helpful else resources - {resource_id}
+        if resources:
+            self._helpful[student_id] = resources
+        else:
+            del self._helpful[student_id]
+        self.version += 1
+
+    def helpful_resources(self, student_id: int) -> Set[str]:
+        return set(self._helpful.get(student_id, ()))
+
+    def recommend(self, student_id: int, topics: Iterable[str], limit: int = 5) -> List[Tuple[Dict, int]]:
+        """``(resource, n_students)`` pairs, best first.
+
+        ``n_students`` is how many similar students the resource helped.
+        Resources the student already marked helpful are skipped.
+        """
+        if not self.has_feedback:
+            return []
+        own = self._helpful.get(student_id, ())
+        scores: Dict[str, float] = defaultdict(float)
+        votes: Dict[str, int] = defaultdict(int)
+        for neighbour_id, similarity in self.knn.query(student_id, self.n_neighbours):
+            if similarity <= 0:
+                continue
+            for resource_id in self._helpful.get(neighbour_id, ()):
+                if resource_id not in own:
+                    scores[resource_id] += similarity
+                    votes[resource_id] += 1
+
+        topics = list(topics)
+        recommendations = []
+        for resource_id in sorted(scores, key=lambda rid: (-scores[rid], rid)):
+            if self.resources.shares_topic(resource_id, topics):
+                recommendations.append((self.resources.get(resource_id), votes[resource_id]))
+                if len(recommendations) == limit:
+                    break
+        return recommendations
@@ -0,0 +1,399 @@
+"""Compact, array-backed catalog of learning resources with topic matching.
+
+Topics, types and difficulty levels are interned to small integer ids. Each
+resource's topic set is a bitset packed in byte words, stored one word per
+row so that matching a module reads only the rows holding the module's
+topics: ``bits & mask`` over those rows gives the candidates and
+``popcount`` their topic overlap, in a few vectorized passes. Byte words keep
+each row at one byte per resource, 8x less memory traffic per query than
+``uint64`` words. Titles and URLs live in
+UTF-8 blobs with one offset pair per resource, and the resource id is the
+only per-resource Python string.
+
+Callers get a :class:`ResourceRecord`, a read-only mapping view over one
+resource, in place of the historical per-resource dicts.
+"""
+import json
+from collections.abc import Mapping
+from itertools import islice
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+# Ordinal difficulty levels used for the difficulty-fit score
+DIFFICULTY_LEVELS = {"beginner": 0, "intermediate": 1, "advanced": 2}
+
+# Weight of the difficulty fit (0..1) relative to one shared topic
+DIFFICULTY_WEIGHT = 0.5
+
+RESOURCE_FIELDS = ("resource_id", "title", "url", "type", "topics", "difficulty")
+
+
+def difficulty_fit(resource_difficulty: Optional[str], module_difficulty: Optional[str]) -> float:
+    """1.0 for the same level, 0.0 for opposite ends, 0.5 if either is unknown."""
+    r = DIFFICULTY_LEVELS.get(resource_difficulty)
+    m = DIFFICULTY_LEVELS.get(module_difficulty)
+    if r is None or m is None:
+        return 0.5
+    return 1.0 - abs(r - m) / (len(DIFFICULTY_LEVELS) - 1)
+
+
+# Topic bitset words: topic id t is bit t % 8 of row t // 8
+WORD_BITS = 8
+WORD_DTYPE = np.uint8
+
+if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+    def popcount(words: np.ndarray) -> np.ndarray:
+        """Number of set bits of each word."""
+        return np.bitwise_count(words)
+else:
+    _POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+    def popcount(words: np.ndarray) -> np.ndarray:
+        """Number of set bits of each word (byte lookup table)."""
+        return np.take(_POPCOUNT, words)
+
+
+class Vocabulary:
+    """Interned integer ids for a small set of repeated values."""
+
+    __slots__ = ("_ids", "values")
+
+    def __init__(self, values: Iterable[Hashable] = ()):
+        self._ids: Dict[Hashable, int] = {}
+        self.values: List[Hashable] = []
+        for value in values:
+            self.id(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def id(self, value: Hashable) -> int:
+        """Id of ``value``, allocated on first use."""
+        vid = self._ids.get(value)
+        if vid is None:
+            vid = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return vid
+
+    def get(self, value: Hashable) -> Optional[int]:
+        return self._ids.get(value)
+
+
+class PackedStrings:
+    """Strings stored as one UTF-8 blob plus a ``(start, end)`` pair per slot.
+
+    A replaced value stays in the blob as garbage until :meth:`compact`.
+    """
+
+    __slots__ = ("_data", "_bounds", "garbage")
+
+    def __init__(self, capacity: int):
+        self._data = bytearray()
+        self._bounds = np.zeros((capacity, 2), dtype=np.int64)
+        self.garbage = 0
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data) + self._bounds.nbytes
+
+    def __getitem__(self, slot: int) -> str:
+        start, end = self._bounds[slot].tolist()
+        return self._data[start:end].decode("utf-8")
+
+    def set(self, slot: int, value: str):
+        start, end = self._bounds[slot].tolist()
+        self.garbage += end - start
+        encoded = value.encode("utf-8")
+        start = len(self._data)
+        self._data += encoded
+        self._bounds[slot] = (start, start + len(encoded))
+
+    def extend(self, start: int, values: Iterable[str]):
+        """Set consecutive slots from ``start`` in one pass."""
+        encoded = [value.encode("utf-8") for value in values]
+        ends = np.cumsum([len(value) for value in encoded], dtype=np.int64) + len(self._data)
+        self._bounds[start:start + len(encoded), 1] = ends
+        self._bounds[start:start + len(encoded), 0] = ends - [len(value) for value in encoded]
+        self._data += b"".join(encoded)
+
+    def clear(self, slot: int):
+        start, end = self._bounds[slot].tolist()
+        self.garbage += end - start
+        self._bounds[slot] = (0, 0)
+
+    def grow(self, capacity: int):
+        bounds = np.zeros((capacity, 2), dtype=np.int64)
+        bounds[:len(self._bounds)] = self._bounds
+        self._bounds = bounds
+
+    def compact(self, slots: Iterable[int]):
+        """Rewrite the blob with the values of ``slots`` only."""
+        data = bytearray()
+        for slot in slots:
+            start, end = self._bounds[slot].tolist()
+            self._bounds[slot] = (len(data), len(data) + end - start)
+            data += self._data[start:end]
+        self._data = data
+        self.garbage = 0
+
+
+class ResourceRecord(Mapping):
+    """Read-only dict-like view over one resource of a :class:`ResourceIndex`."""
+
+    __slots__ = ("_index", "_slot")
+
+    def __init__(self, index: "ResourceIndex", slot: int):
+        self._index = index
+        self._slot = slot
+
+    def __getitem__(self, key):
+        index, slot = self._index, self._slot
+        if key == "resource_id":
+            return index._ids[slot]
+        if key == "title":
+            return index._titles[slot]
+        if key == "url":
+            return index._urls[slot]
+        if key == "type":
+            return index.types.values[index._type[slot]]
+        if key == "difficulty":
+            return index.difficulties.values[index._difficulty[slot]]
+        if key == "topics":
+            return index.topic_names(slot)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(RESOURCE_FIELDS)
+
+    def __len__(self) -> int:
+        return len(RESOURCE_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"ResourceRecord({dict(self)!r})"
+
+
+class ResourceIndex:
+    """Columnar resource catalog with bitset topic matching and top-k ranking.
+
+    Resources are added in catalog order; replacing a resource keeps its
+    position. Only the fields in ``RESOURCE_FIELDS`` are kept.
+    """
+
+    def __init__(self, resources: Iterable[Mapping] = (), capacity: int = 16):
+        self.version = 0
+        self.topics = Vocabulary()
+        self.types = Vocabulary()
+        # Known levels first, so a difficulty id is its DIFFICULTY_LEVELS rank
+        self.difficulties = Vocabulary([*DIFFICULTY_LEVELS, None])
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._titles = PackedStrings(capacity)
+        self._urls = PackedStrings(capacity)
+        self._type = np.zeros(capacity, dtype=np.uint8)
+        self._difficulty = np.zeros(capacity, dtype=np.uint8)
+        # One row per WORD_BITS topic ids, one column per resource
+        self._bits = np.zeros((1, capacity), dtype=WORD_DTYPE)
+        self.extend(resources)
+
+    @classmethod
+    def load(cls, path: str) -> "ResourceIndex":
+        """Build the index from a JSON array of resources, or JSON Lines (``.jsonl``)."""
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                return cls(json.loads(line) for line in f if line.strip())
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays and string blobs (capacity, not just size)."""
+        return (self._titles.nbytes + self._urls.nbytes + self._type.nbytes
+                + self._difficulty.nbytes + self._bits.nbytes)
+
+    def topic_id(self, topic: str) -> int:
+        """Interned integer id of a topic, allocated on first use."""
+        tid = self.topics.id(topic)
+        if tid >= WORD_BITS * len(self._bits):
+            bits = np.zeros((2 * len(self._bits), self._bits.shape[1]), dtype=WORD_DTYPE)
+            bits[:len(self._bits)] = self._bits
+            self._bits = bits
+        return tid
+
+    def topic_mask(self, topics: Iterable[str]) -> Dict[int, int]:
+        """Query bitset of known ``topics`` as ``{word: bits}``."""
+        words: Dict[int, int] = {}
+        for topic in topics:
+            tid = self.topics.get(topic)
+            if tid is not None:
+                w = tid // WORD_BITS
+                words[w] = words.get(w, 0) | (1 << (tid % WORD_BITS))
+        return words
+
+    def topic_names(self, slot: int) -> List[str]:
+        """Topics of the resource in ``slot``, in topic id order."""
+        names = []
+        for w, word in enumerate(self._bits[:, slot].tolist()):
+            while word:
+                low = word & -word
+                names.append(self.topics.values[WORD_BITS * w + low.bit_length() - 1])
+                word ^= low
+        return names
+
+    def add(self, resource: Mapping):
+        """Add a resource, replacing any resource with the same id in place."""
+        resource_id = resource["resource_id"]
+        # Read and intern every field before writing, so a bad resource leaves the index untouched
+        title, url = resource["title"], resource["url"]
+        (type_id,) = self._interned_all(self.types, [resource["type"]])
+        (difficulty_id,) = self._interned_all(self.difficulties, [resource.get("difficulty")])
+        topic_ids = [self.topic_id(topic) for topic in resource["topics"]]
+        slot = self._slots.get(resource_id)
+        if slot is None:
+            slot = len(self._ids)
+            if slot == self._bits.shape[1]:
+                self._grow(2 * slot)
+            self._ids.append(resource_id)
+            self._slots[resource_id] = slot
+        self._bits[:, slot] = 0
+        for tid in topic_ids:
+            self._bits[tid // WORD_BITS, slot] |= 1 << (tid % WORD_BITS)
+        self._titles.set(slot, title)
+        self._urls.set(slot, url)
+        self._type[slot] = type_id
+        self._difficulty[slot] = difficulty_id
+        self._compact_strings()
+        self.version += 1
+
+    def extend(self, resources: Iterable[Mapping]):
+        """Add many resources: runs of new ids are written column by column."""
+        batch: Dict[str, Mapping] = {}
+        for resource in resources:
+            resource_id = resource["resource_id"]
+            if resource_id in self._slots or resource_id in batch:
+                self._append(list(batch.values()))
+                batch.clear()
+                self.add(resource)
+            else:
+                batch[resource_id] = resource
+        self._append(list(batch.values()))
+
+    def _append(self, resources: List[Mapping]):
+        if not resources:
+            return
+        start, end = len(self._ids), len(self._ids) + len(resources)
+        # Read and intern every field before writing, so a bad batch leaves the index untouched
+        titles = [resource["title"] for resource in resources]
+        urls = [resource["url"] for resource in resources]
+        type_ids = self._interned_all(self.types, [resource["type"] for resource in resources])
+        difficulty_ids = self._interned_all(self.difficulties, [resource.get("difficulty") for resource in resources])
+        topic_slots, topic_ids = [], []
+        for slot, resource in enumerate(resources, start):
+            for topic in resource["topics"]:
+                topic_slots.append(slot)
+                topic_ids.append(self.topic_id(topic))
+        if end > self._bits.shape[1]:
+            self._grow(max(end, 2 * self._bits.shape[1]))
+        topic_ids = np.array(topic_ids, dtype=np.intp)
+        np.bitwise_or.at(self._bits, (topic_ids // WORD_BITS, np.array(topic_slots, dtype=np.intp)),
+                         (1 << (topic_ids % WORD_BITS)).astype(WORD_DTYPE))
+        self._titles.extend(start, titles)
+        self._urls.extend(start, urls)
+        self._type[start:end] = type_ids
+        self._difficulty[start:end] = difficulty_ids
+        for slot, resource in enumerate(resources, start):
+            self._ids.append(resource["resource_id"])
+            self._slots[resource["resource_id"]] = slot
+        self.version += 1
+
+    def remove(self, resource_id: str) -> bool:
+        """Remove a resource by id. Returns False if it was not indexed."""
+        slot = self._slots.pop(resource_id, None)
+        if slot is None:
+            return False
+        # The slot is not reused: with no topic bits it never matches
+        self._ids[slot] = None
+        self._bits[:, slot] = 0
+        self._titles.clear(slot)
+        self._urls.clear(slot)
+        self._compact_strings()
+        self.version += 1
+        return True
+
+    def get(self, resource_id: str) -> Optional[ResourceRecord]:
+        """Indexed resource by id, or None."""
+        slot = self._slots.get(resource_id)
+        return ResourceRecord(self, slot) if slot is not None else None
+
+    def shares_topic(self, resource_id: str, topics: Iterable[str]) -> bool:
+        """True if the resource is indexed and has one of ``topics``."""
+        slot = self._slots.get(resource_id)
+        if slot is None:
+            return False
+        bits = self._bits
+        return any(int(bits[w, slot]) & mask for w, mask in self.topic_mask(topics).items())
+
+    def first(self, limit: int) -> List[ResourceRecord]:
+        """First ``limit`` resources in catalog order."""
+        return [ResourceRecord(self, slot) for slot in islice(self._slots.values(), limit)]
+
+    def matches(self, topics: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Slots sharing at least one of ``topics`` and how many they share."""
+        n, bits = len(self._ids), self._bits
+        masks = self.topic_mask(set(topics))
+        if not masks:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.uint8)
+        # One byte per resource while the overlap cannot exceed 255 shared topics
+        n_topics = sum(bin(mask).count("1") for mask in masks.values())
+        counts = np.zeros(n, dtype=np.uint8 if n_topics <= 255 else np.uint32)
+        for w, mask in masks.items():
+            hit = bits[w, :n] & WORD_DTYPE(mask)
+            # A one-topic word needs no bit counting
+            counts += popcount(hit) if mask & (mask - 1) else (hit != 0)
+        slots = np.flatnonzero(counts != 0)  # nonzero() runs faster over bools
+        return slots, counts[slots]
+
+    def top_k(self, topics: Iterable[str], difficulty: str, limit: int) -> List[ResourceRecord]:
+        """Best ``limit`` resources sharing at least one topic.
+
+        Resources are scored by the number of shared topics plus a weighted
+        difficulty fit; ties keep catalog order.
+        """
+        candidates, overlap = self.matches(topics)
+        if not len(candidates) or limit <= 0:
+            return []
+        # Difficulty fit only depends on the resource's level: score each level once
+        fits = np.array([DIFFICULTY_WEIGHT * difficulty_fit(level, difficulty) for level in self.difficulties.values])
+        scores = overlap + np.take(fits, np.take(self._difficulty, candidates))
+        if len(candidates) > limit:
+            kth = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            keep = scores >= kth
+            candidates, scores = candidates[keep], scores[keep]
+        # Candidates are in slot order: a stable sort keeps catalog order among ties
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [ResourceRecord(self, slot) for slot in candidates[order].tolist()]
+
+    @staticmethod
+    def _interned_all(vocabulary: Vocabulary, values: List) -> List[int]:
+        """Ids of ``values``; raises before allocating any if they would not fit the uint8 columns."""
+        new = {value for value in values if vocabulary.get(value) is None}
+        if len(vocabulary) + len(new) > 256:
+            raise ValueError(f"More than 256 distinct values: {sorted(map(repr, new))[:5]}")
+        return [vocabulary.id(value) for value in values]
+
+    def _grow(self, capacity: int):
+        self._titles.grow(capacity)
+        self._urls.grow(capacity)
+        self._type = np.resize(self._type, capacity)
+        self._difficulty = np.resize(self._difficulty, capacity)
+        bits = np.zeros((len(self._bits), capacity), dtype=WORD_DTYPE)
+        bits[:, :self._bits.shape[1]] = self._bits
+        self._bits = bits
+
+    def _compact_strings(self):
+        for strings in (self._titles, self._urls):
+            if strings.garbage > 4096 and strings.garbage > strings.nbytes // 2:
+                strings.compact(self._slots.values())
@@ -0,0 +1,123 @@
+"""Materialized student × module success-probability matrix.
+
+Rows follow the :class:`StudentStore` rows and columns the module list. The
+matrix is computed once with the ``/predict`` heuristic and kept current by a
+store listener that recomputes only the row of the student that changed.
+Rankings use ``argpartition`` so a top-N query is O(students) with no full sort;
+the matrix is column-major so each module's column is contiguous.
+
+The float32 matrix only orders students. What is reported comes from two
+uint8 matrices filled from the float64 probability, exactly as ``/predict``
+computes it: the probability rounded to a percent and the risk code, so a
+value on a risk threshold gets the same label and rounding as ``/predict``.
+"""
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .scoring import RISK_LEVELS, heuristic_proba_batch, risk_codes, round2
+from .student_store import StudentStore
+
+
+class RiskMatrix:
+    """Dense float32 probability matrix with top-N and histogram queries."""
+
+    def __init__(self, store: StudentStore, module_codes: Sequence[str]):
+        self.store = store
+        self.module_codes: List[str] = list(module_codes)
+        self._module_index: Dict[str, int] = {code: j for j, code in enumerate(self.module_codes)}
+        self._lock = threading.Lock()
+        self._size = 0
+        self._matrix, self._percent, self._risk = self._allocate(0)
+        self.rebuild()
+        store.add_listener(self._on_student_updated)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def has_module(self, module_code: str) -> bool:
+        return module_code in self._module_index
+
+    def _allocate(self, rows: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        shape = (rows, len(self.module_codes))
+        return (np.empty(shape, dtype=np.float32, order="F"),
+                np.empty(shape, dtype=np.uint8, order="F"),
+                np.empty(shape, dtype=np.uint8, order="F"))
+
+    def _score_rows(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """float32 probabilities, rounded percents and risk codes of ``rows``, one column per module."""
+        proba = heuristic_proba_batch(self.store.gather("avg_score", rows), self.store.gather("study_hours_per_week", rows))
+        percent = np.rint(round2(proba) * 100.0).astype(np.uint8)
+        # The current heuristic does not depend on the module: same value in every column
+        return tuple(np.repeat(values[:, None], len(self.module_codes), axis=1)
+                     for values in (proba.astype(np.float32), percent, risk_codes(proba)))
+
+    def rebuild(self):
+        """Recompute the whole matrix from the store."""
+        size = len(self.store)
+        arrays = self._allocate(max(size, 16))
+        for array, values in zip(arrays, self._score_rows(np.arange(size))):
+            array[:size] = values
+        with self._lock:
+            self._matrix, self._percent, self._risk = arrays
+            self._size = size
+
+    def _on_student_updated(self, student_id: int, row: int):
+        scored = self._score_rows(np.array([row]))
+        with self._lock:
+            arrays = (self._matrix, self._percent, self._risk)
+            if row >= len(self._matrix):
+                grown = self._allocate(max(2 * len(self._matrix), row + 1))
+                for new, old in zip(grown, arrays):
+                    new[:self._size] = old[:self._size]
+                self._matrix, self._percent, self._risk = arrays = grown
+            for array, values in zip(arrays, scored):
+                array[row] = values[0]
+            self._size = max(self._size, row + 1)
+
+    def _ranked(self, values: np.ndarray, percent: np.ndarray, risk: np.ndarray, labels: np.ndarray,
+                n: int, highest_risk: bool) -> List[Tuple]:
+        """``n`` (label, proba, risk level) triples, riskiest (lowest proba) first unless reversed."""
+        keys = values if highest_risk else -values
+        n = min(n, len(keys))
+        if n <= 0:
+            return []
+        idx = np.argpartition(keys, n - 1)[:n] if n < len(keys) else np.arange(len(keys))
+        idx = idx[np.lexsort((labels[idx], keys[idx]))]
+        return list(zip(labels[idx].tolist(), (percent[idx] / 100.0).tolist(), RISK_LEVELS[risk[idx]].tolist()))
+
+    def top_students(self, module_code: str, n: int = 20,
+                     highest_risk: bool = True) -> List[Tuple[int, float, str]]:
+        """``(student_id, proba, risk_level)`` of the ``n`` highest-risk (or lowest-risk) students in a module."""
+        j = self._module_index[module_code]
+        with self._lock:
+            values = self._matrix[:self._size, j].copy()
+            percent = self._percent[:self._size, j].copy()
+            risk = self._risk[:self._size, j].copy()
+        return self._ranked(values, percent, risk, self.store.ids[:len(values)], n, highest_risk)
+
+    def top_modules(self, student_id: int, n: int = 5, highest_risk: bool = True) -> List[Tuple[str, float, str]]:
+        """``(module_code, proba, risk_level)`` of a student's ``n`` riskiest (or safest) modules."""
+        row = self.store.row_of(student_id)
+        if row is None:
+            raise KeyError(student_id)
+        with self._lock:
+            values = self._matrix[row].copy()
+            percent = self._percent[row].copy()
+            risk = self._risk[row].copy()
+        return self._ranked(values, percent, risk, np.array(self.module_codes), n, highest_risk)
+
+    def histogram(self, module_code: str, bins: int = 10) -> Dict:
+        """Probability histogram over ``[0, 1]`` and risk-level counts for a module."""
+        j = self._module_index[module_code]
+        with self._lock:
+            values = self._matrix[:self._size, j].astype(np.float64)
+            risk_counts = np.bincount(self._risk[:self._size, j], minlength=len(RISK_LEVELS))
+        counts, edges = np.histogram(values, bins=bins, range=(0.0, 1.0))
+        return {
+            "bin_edges": np.round(edges, 6).tolist(),
+            "counts": counts.tolist(),
+            "risk_counts": {"Low": int(risk_counts[2]), "Medium": int(risk_counts[1]), "High": int(risk_counts[0])},
+            "mean": float(values.mean()) if len(values) else 0.0,
+        }
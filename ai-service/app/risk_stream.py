@@ -0,0 +1,213 @@
+"""Push of prediction changes to subscribed clients (Server-Sent Events).
+
+A client subscribes to a set of ``(student_id, module_code)`` pairs and
+receives a ``PredictionResponse`` event when a pair's ``risk_level`` changes
+or its ``success_proba`` moves by at least ``min_delta`` since the last event
+pushed for that pair. Updates come from student store changes (new events,
+ingested metrics): the store listener re-scores the subscribed modules of that
+student with the same ``predict`` function as the snapshot, so every event of
+a pair comes from one scoring model.
+
+All subscription state lives on the event loop; calls from other threads are
+handed over with ``call_soon_threadsafe``. A change is filtered and encoded
+once per pair, then fanned out to the subscribers of that pair only. Each
+connection keeps at most one pending event per pair, the newest one, so a
+slow or stalled client costs a bounded buffer and skips intermediate values
+instead of queuing them.
+"""
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .libs import fast_json
+
+Pair = Tuple[int, str]
+
+
+def sse_event(event: str, payload: Mapping) -> bytes:
+    """One Server-Sent Events message with a JSON payload."""
+    return b"event: " + event.encode() + b"\ndata: " + fast_json.dumps(payload) + b"\n\n"
+
+
+KEEPALIVE = b": keep-alive\n\n"
+
+
+class Subscription:
+    """One client connection: its pairs and the latest unsent event per pair."""
+
+    __slots__ = ("pairs", "_pending", "_wakeup", "_active")
+
+    def __init__(self, pairs: Iterable[Pair]):
+        self.pairs: Tuple[Pair, ...] = tuple(dict.fromkeys(pairs))
+        self._pending: Dict[Pair, bytes] = {}
+        self._wakeup = asyncio.Event()
+        self._active = True
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def push(self, pair: Pair, event: bytes) -> bool:
+        """Queue ``event`` for ``pair``; True if it replaced an unsent one."""
+        replaced = pair in self._pending
+        self._pending[pair] = event
+        self._wakeup.set()
+        return replaced
+
+    def keepalive_due(self):
+        """Wake the connection for a keep-alive if nothing was sent since the last call."""
+        if self._active:
+            self._active = False
+        else:
+            self._wakeup.set()
+
+    async def next_events(self) -> List[bytes]:
+        """Wait for pending events (an empty list means a keep-alive is due)."""
+        await self._wakeup.wait()
+        self._wakeup.clear()
+        self._active = True
+        events = list(self._pending.values())
+        self._pending.clear()
+        return events
+
+
+class RiskBroadcaster:
+    """Filters prediction changes and fans them out to subscriptions.
+
+    ``predict(student_id, module_code)`` returns the current prediction dict
+    (``None`` for an unknown student or module); it is used for the initial
+    snapshot and to re-score students after a store change.
+    """
+
+    def __init__(self, predict: Callable[[int, str], Optional[Dict]], min_delta: float = 0.05,
+                 max_subscriptions: int = 10000, keepalive_seconds: float = 15.0):
+        self.predict = predict
+        self.min_delta = min_delta
+        self.max_subscriptions = max_subscriptions
+        self.keepalive_seconds = keepalive_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self._subscriptions: Set[Subscription] = set()
+        self._subscribers: Dict[Pair, Set[Subscription]] = {}
+        self._modules_by_student: Dict[int, Dict[str, int]] = {}
+        self._last: Dict[Pair, Tuple[float, str]] = {}
+        self.published = 0
+        self.suppressed = 0
+        self.queued = 0
+        self.conflated = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscriptions) >= self.max_subscriptions
+
+    def subscribe(self, pairs: Iterable[Pair]) -> Subscription:
+        """Register a subscription (on the event loop); its first events are the current predictions."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(pairs)
+        self._subscriptions.add(subscription)
+        if self._keepalive_task is None or self._keepalive_task.done():
+            self._keepalive_task = self._loop.create_task(self._keepalive())
+        for pair in subscription.pairs:
+            student_id, module_code = pair
+            self._subscribers.setdefault(pair, set()).add(subscription)
+            modules = self._modules_by_student.setdefault(student_id, {})
+            modules[module_code] = modules.get(module_code, 0) + 1
+            result = self.predict(student_id, module_code)
+            if result is None:
+                continue
+            self._last.setdefault(pair, (result["success_proba"], result["risk_level"]))
+            subscription.push(pair, sse_event("prediction", result))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.discard(subscription)
+        for pair in subscription.pairs:
+            student_id, module_code = pair
+            subscribers = self._subscribers[pair]
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[pair]
+                self._last.pop(pair, None)
+            modules = self._modules_by_student[student_id]
+            modules[module_code] -= 1
+            if not modules[module_code]:
+                del modules[module_code]
+                if not modules:
+                    del self._modules_by_student[student_id]
+
+    async def stream(self, pairs: Iterable[Pair]) -> AsyncIterator[bytes]:
+        """SSE body for a new subscription to ``pairs``, unsubscribed when the client goes away."""
+        # Subscribing here rather than in the endpoint: a response that never starts leaves nothing behind
+        subscription = self.subscribe(pairs)
+        try:
+            while True:
+                events = await subscription.next_events()
+                yield b"".join(events) if events else KEEPALIVE
+        finally:
+            self.unsubscribe(subscription)
+
+    def on_student_updated(self, student_id: int, row: int = -1):
+        """Store listener: re-score the subscribed modules of ``student_id``."""
+        if student_id in self._modules_by_student:
+            self._call_on_loop(self._rescore, student_id)
+
+    def stats(self) -> Dict:
+        return {
+            "subscriptions": len(self._subscriptions),
+            "max_subscriptions": self.max_subscriptions,
+            "pairs": len(self._subscribers),
+            "students": len(self._modules_by_student),
+            "min_delta": self.min_delta,
+            "published": self.published,
+            "suppressed": self.suppressed,
+            "queued": self.queued,
+            "conflated": self.conflated,
+            "pending": sum(s.pending for s in self._subscriptions),
+        }
+
+    async def _keepalive(self):
+        # One timer for all connections instead of one per connection. A comment
+        # line goes to connections silent for a whole interval, so that proxies
+        # do not close them
+        while self._subscriptions:
+            await asyncio.sleep(self.keepalive_seconds)
+            for subscription in tuple(self._subscriptions):
+                subscription.keepalive_due()
+
+    def _call_on_loop(self, func: Callable, *args):
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            func(*args)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(func, *args)
+
+    def _rescore(self, student_id: int):
+        for module_code in tuple(self._modules_by_student.get(student_id, ())):
+            result = self.predict(student_id, module_code)
+            if result is not None:
+                self._publish(result)
+
+    def _publish(self, result: Dict):
+        pair: Pair = (result["student_id"], result["module_code"])
+        subscribers = self._subscribers.get(pair)
+        if not subscribers:
+            return
+        proba, risk = result["success_proba"], result["risk_level"]
+        last = self._last.get(pair)
+        # Tolerance for the 2-decimal rounding of success_proba
+        if last is not None and last[1] == risk and abs(proba - last[0]) < self.min_delta - 1e-9:
+            self.suppressed += 1
+            return
+        self._last[pair] = (proba, risk)
+        event = sse_event("prediction", result)
+        for subscription in subscribers:
+            self.conflated += subscription.push(pair, event)
+        self.published += 1
+        self.queued += len(subscribers)
@@ -0,0 +1,59 @@
+"""Success-probability heuristic shared by the single and batch prediction paths.
+
+The scalar helpers are the reference implementation used by ``/predict``; the
+``*_batch`` variants apply exactly the same float64 operations to NumPy arrays
+so that ``/predict/batch`` returns bit-identical results.
+"""
+import numpy as np
+
+
+# Risk thresholds applied to the unrounded probability
+LOW_RISK_THRESHOLD = 0.8
+MEDIUM_RISK_THRESHOLD = 0.6
+
+RISK_LEVELS = np.array(["High", "Medium", "Low"], dtype=object)
+
+
+def heuristic_proba(avg_score: float, study_hours_per_week: float) -> float:
+    """Success probability from a student's average score and study hours."""
+    base_proba = avg_score / 100.0
+    study_bonus = min(study_hours_per_week / 40.0, 0.2)
+    return min(base_proba + study_bonus, 1.0)
+
+
+def risk_level(proba: float) -> str:
+    """Risk label for a success probability."""
+    return "Low" if proba > LOW_RISK_THRESHOLD else "Medium" if proba > MEDIUM_RISK_THRESHOLD else "High"
+
+
+def heuristic_proba_batch(avg_score: np.ndarray, study_hours_per_week: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`heuristic_proba` over float64 feature columns."""
+    base_proba = np.asarray(avg_score, dtype=np.float64) / 100.0
+    study_bonus = np.minimum(np.asarray(study_hours_per_week, dtype=np.float64) / 40.0, 0.2)
+    return np.minimum(base_proba + study_bonus, 1.0)
+
+
+def risk_codes(proba: np.ndarray) -> np.ndarray:
+    """Index into :data:`RISK_LEVELS` of each probability's risk label, as uint8."""
+    return (proba > MEDIUM_RISK_THRESHOLD).astype(np.uint8) + (proba > LOW_RISK_THRESHOLD)
+
+
+def risk_levels(proba: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`risk_level`, returns an object array of labels."""
+    return RISK_LEVELS[risk_codes(proba)]
+
+
+def round2(values: np.ndarray) -> np.ndarray:
+    """Round to 2 decimals exactly like the builtin ``round(x, 2)``.
+
+    ``np.round`` scales by 100 before rounding, which can land on the other
+    side of a .5 boundary; the few values close to a tie are re-rounded with
+    the builtin so results never differ from the scalar path.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scaled = values * 100.0
+    rounded = np.rint(scaled) / 100.0
+    near_tie = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
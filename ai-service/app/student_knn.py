@@ -0,0 +1,208 @@
+"""Nearest-neighbour index over normalized student feature vectors.
+
+Students are embedded as z-scored metric vectors (statistics frozen at the last
+full build) scaled to unit length, so a dot product is the cosine similarity.
+Small cohorts are searched exactly with one matrix-vector product.
+
+Large ones use an inverted file: spherical k-means splits the vectors into
+``n_lists`` cells, and a query only re-ranks the rows of its ``n_probe`` most
+similar cells. The metrics are strongly correlated, so random-hyperplane LSH
+buckets stay huge, whereas k-means places its cells where the students are.
+
+Students added or changed since the last merge are kept in a small tail that
+every query scans exactly. Once the tail reaches ``merge_threshold`` its rows
+are assigned to their nearest cell and the cell lists are regrouped.
+"""
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .student_store import STUDENT_COLUMNS, StudentStore
+
+
+FEATURE_NAMES = tuple(STUDENT_COLUMNS)
+
+# Rows scored against the centroids per matrix product
+_ASSIGN_CHUNK = 8192
+
+
+def spherical_kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 8, seed: int = 0) -> np.ndarray:
+    """Unit-length centroids maximizing the cosine to their members."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = assign_cells(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Re-seed empty cells with random vectors
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+def assign_cells(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for each vector."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = vectors[start:start + _ASSIGN_CHUNK]
+        assign[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assign
+
+
+class StudentKnnIndex:
+    """Exact and inverted-file cosine k-nearest-neighbour search over a :class:`StudentStore`.
+
+    ``exact_max_students`` is the cohort size up to which :meth:`query` uses
+    the exact search; above it the inverted file is used. ``n_lists`` defaults
+    to about ``2 * sqrt(students)``. The index follows the store through a
+    listener, so inserts and metric changes are incremental.
+    """
+
+    def __init__(self, store: StudentStore, features: Sequence[str] = FEATURE_NAMES,
+                 exact_max_students: int = 20000, n_lists: Optional[int] = None, n_probe: int = 8,
+                 train_size: int = 20000, merge_threshold: int = 4096, seed: int = 0):
+        self.store = store
+        self.features = tuple(features)
+        self.exact_max_students = exact_max_students
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_size = train_size
+        self.merge_threshold = merge_threshold
+        self.seed = seed
+        self._lock = threading.Lock()
+        self.rebuild()
+        store.add_listener(self._on_student_updated)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # --- Embedding ---
+
+    def _raw(self, rows: np.ndarray) -> np.ndarray:
+        return np.column_stack([self.store.gather(name, rows).astype(np.float64) for name in self.features])
+
+    def _embed(self, rows: np.ndarray, raw: Optional[np.ndarray] = None) -> np.ndarray:
+        raw = self._raw(rows) if raw is None else raw
+        vectors = (raw - self._mean) / self._scale
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors.astype(np.float32)
+
+    # --- Build and maintenance ---
+
+    def rebuild(self):
+        """Re-fit the normalization and the cells, then re-index every student."""
+        size = len(self.store)
+        rows = np.arange(size)
+        raw = self._raw(rows) if size else np.empty((0, len(self.features)))
+        mean = raw.mean(axis=0) if size else np.zeros(len(self.features))
+        std = raw.std(axis=0) if size else np.ones(len(self.features))
+        with self._lock:
+            self._mean = mean
+            self._scale = np.where(std > 1e-9, std, 1.0)
+            vectors = np.empty((max(size, 16), len(self.features)), dtype=np.float32)
+            vectors[:size] = self._embed(rows, raw)
+            self._vectors = vectors
+            self._size = size
+            self._centroids = None
+            n_lists = self.n_lists or int(2 * np.sqrt(size))
+            if size > self.exact_max_students and n_lists > 1:
+                rng = np.random.default_rng(self.seed)
+                sample = vectors[rng.choice(size, min(size, max(self.train_size, n_lists)), replace=False)]
+                self._centroids = spherical_kmeans(sample, n_lists, seed=self.seed)
+            self._assign = np.zeros(len(vectors), dtype=np.int32)
+            self._indexed = 0
+            self._dirty = set()
+            self._merge()
+
+    def _on_student_updated(self, student_id: int, row: int):
+        vector = self._embed(np.array([row]))[0]
+        with self._lock:
+            if row >= len(self._vectors):
+                capacity = max(2 * len(self._vectors), row + 1)
+                grown = np.empty((capacity, len(self.features)), dtype=np.float32)
+                grown[:self._size] = self._vectors[:self._size]
+                self._vectors = grown
+                self._assign = np.resize(self._assign, capacity)
+            self._vectors[row] = vector
+            self._size = max(self._size, row + 1)
+            if row < self._indexed:
+                # Its cell may have changed: scan it exactly until merged
+                self._dirty.add(row)
+            if self._size - self._indexed + len(self._dirty) >= self.merge_threshold:
+                self._merge()
+
+    def _merge(self):
+        """Assign the tail and changed rows to cells and regroup the lists (lock held)."""
+        if self._centroids is None:
+            self._indexed = self._size
+            self._dirty = set()
+            return
+        rows = np.concatenate([np.fromiter(self._dirty, dtype=np.int64, count=len(self._dirty)),
+                               np.arange(self._indexed, self._size)])
+        self._assign[rows] = assign_cells(self._vectors[rows], self._centroids)
+        assign = self._assign[:self._size]
+        self._list_rows = np.argsort(assign, kind="stable")
+        self._list_offsets = np.searchsorted(assign[self._list_rows], np.arange(len(self._centroids) + 1))
+        self._indexed = self._size
+        self._dirty = set()
+
+    # --- Queries ---
+
+    def vector(self, student_id: int) -> np.ndarray:
+        """Normalized feature vector of a student (defaults if unknown)."""
+        row = self.store.row_of(student_id)
+        if row is not None:
+            with self._lock:
+                return self._vectors[row].copy()
+        return self._embed(np.array([-1]))[0]
+
+    def query(self, student_id: int, k: int = 10, exact: Optional[bool] = None) -> List[Tuple[int, float]]:
+        """``(student_id, cosine)`` of the ``k`` students most similar to a student."""
+        return self.query_vector(self.vector(student_id), k, exclude=self.store.row_of(student_id), exact=exact)
+
+    def query_vector(self, vector: np.ndarray, k: int = 10, exclude: Optional[int] = None,
+                     exact: Optional[bool] = None) -> List[Tuple[int, float]]:
+        """``(student_id, cosine)`` of the ``k`` stored students most similar to ``vector``.
+
+        ``exact`` forces (True) or disables (False) the exact search; by
+        default it is used up to ``exact_max_students``.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if exact is None:
+                exact = self._size <= self.exact_max_students
+            if exact or self._centroids is None:
+                rows = np.arange(self._size)
+                similarities = self._vectors[:self._size] @ vector
+            else:
+                rows = self._candidates(vector)
+                similarities = self._vectors[rows] @ vector
+        if exclude is not None:
+            keep = rows != exclude
+            rows, similarities = rows[keep], similarities[keep]
+        k = min(k, len(rows))
+        if k <= 0:
+            return []
+        top = np.argpartition(-similarities, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        ids = self.store.ids
+        return list(zip(ids[rows[top]].tolist(), similarities[top].astype(np.float64).tolist()))
+
+    def _candidates(self, vector: np.ndarray) -> np.ndarray:
+        """Rows of the ``n_probe`` cells most similar to ``vector``, plus the tail (lock held)."""
+        cell_similarities = self._centroids @ vector
+        n_probe = min(self.n_probe, len(cell_similarities))
+        cells = np.argpartition(-cell_similarities, n_probe - 1)[:n_probe]
+        offsets = self._list_offsets
+        parts = [self._list_rows[offsets[c]:offsets[c + 1]] for c in cells.tolist()]
+        parts.append(np.arange(self._indexed, self._size))
+        if self._dirty:
+            # Changed rows may also still sit in a probed cell: drop duplicates
+            parts.append(np.fromiter(self._dirty, dtype=np.int64, count=len(self._dirty)))
+            return np.unique(np.concatenate(parts))
+        return np.concatenate(parts)
@@ -0,0 +1,230 @@
+"""Columnar, array-backed storage for student metrics.
+
+Each metric lives in one typed NumPy column and an ``id -> row`` dict gives
+O(1) lookups. Callers that expect the historical per-student dicts get a
+:class:`StudentRow`, a read-only mapping view over one row of the columns.
+"""
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+# Metric columns and their storage types
+STUDENT_COLUMNS = {
+    "avg_score": np.float64,
+    "attendance_rate": np.float64,
+    "assignment_completion": np.float64,
+    "forum_participation": np.int64,
+    "study_hours_per_week": np.int64,
+    "previous_modules_passed": np.int64,
+}
+_INTEGER_COLUMNS = frozenset(name for name, dtype in STUDENT_COLUMNS.items() if np.issubdtype(dtype, np.integer))
+
+STUDENT_FIELDS = ("student_id", "name") + tuple(STUDENT_COLUMNS)
+
+
+def _checked(name: str, value):
+    """``value`` for column ``name``; counts must be whole numbers instead of being truncated."""
+    if name in _INTEGER_COLUMNS and not float(value).is_integer():
+        raise ValueError(f"{name} must be a whole number, got {value!r}")
+    return value
+
+
+class StudentRow(Mapping):
+    """Read-only dict-like view over one student row of a :class:`StudentStore`.
+
+    A row of ``-1`` denotes a student missing from the store; its metrics come
+    from the store defaults and its name is generated from the id.
+    """
+
+    __slots__ = ("_store", "_row", "_student_id")
+
+    def __init__(self, store: "StudentStore", row: int, student_id: int):
+        self._store = store
+        self._row = row
+        self._student_id = student_id
+
+    def __getitem__(self, key):
+        if key == "student_id":
+            return self._student_id
+        if key == "name":
+            if self._row < 0:
+                return f"Student #{self._student_id}"
+            return self._store._names[self._row]
+        if key not in STUDENT_COLUMNS:
+            raise KeyError(key)
+        if self._row < 0:
+            return self._store.defaults[key]
+        return self._store._columns[key][self._row].item()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(STUDENT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(STUDENT_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"StudentRow({dict(self)!r})"
+
+    @property
+    def is_fallback(self) -> bool:
+        """True when the student is not stored and defaults are used."""
+        return self._row < 0
+
+
+class StudentStore(Mapping):
+    """Typed column per metric plus an ``id -> row`` index.
+
+    Behaves as a read-only ``Mapping[int, StudentRow]``; use :meth:`upsert` and
+    :meth:`update` to change data. ``version`` increases on every change (and
+    :meth:`student_version` is the version of a student's last change) and
+    listeners registered with :meth:`add_listener` are called with
+    ``(student_id, row)`` after it.
+    """
+
+    def __init__(self, defaults: Dict, capacity: int = 1024):
+        self.defaults = {name: defaults[name] for name in STUDENT_COLUMNS}
+        self.version = 0
+        self._size = 0
+        self._index: Dict[int, int] = {}
+        self._listeners: List[Callable[[int, int], None]] = []
+        self._names = []
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._versions = np.empty(capacity, dtype=np.int64)
+        self._columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in STUDENT_COLUMNS.items()}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping], defaults: Dict) -> "StudentStore":
+        """Build a store from per-student dicts."""
+        records = list(records)
+        store = cls(defaults, capacity=max(len(records), 16))
+        for record in records:
+            store.upsert(record)
+        return store
+
+    # --- Mapping interface ---
+
+    def __getitem__(self, student_id: int) -> StudentRow:
+        return StudentRow(self, self._index[student_id], student_id)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, student_id) -> bool:
+        return student_id in self._index
+
+    # --- Lookups ---
+
+    def row(self, student_id: int) -> StudentRow:
+        """Row view for a student, falling back to defaults if unknown."""
+        return StudentRow(self, self._index.get(student_id, -1), student_id)
+
+    def row_of(self, student_id: int) -> Optional[int]:
+        """Row number of a student, or None if unknown."""
+        return self._index.get(student_id)
+
+    def student_version(self, student_id: int) -> int:
+        """Store version of the student's last change (0 if unknown)."""
+        row = self._index.get(student_id)
+        return 0 if row is None else int(self._versions[row])
+
+    def rows_of(self, student_ids: Iterable[int]) -> np.ndarray:
+        """Row numbers for many students, ``-1`` for unknown ones."""
+        index = self._index
+        return np.fromiter((index.get(sid, -1) for sid in student_ids), dtype=np.intp)
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy, read-only view of one metric column."""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Zero-copy, read-only view of the student id column."""
+        view = self._ids[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def gather(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """Values of a column for the given rows, defaults where ``row == -1``."""
+        column = self._columns[name]
+        values = column[np.where(rows >= 0, rows, 0)] if self._size else np.empty(len(rows), column.dtype)
+        values[rows < 0] = self.defaults[name]
+        return values
+
+    def features(self, student_ids: Sequence[int], names: Sequence[str]) -> np.ndarray:
+        """``(len(student_ids), len(names))`` float64 feature matrix."""
+        rows = self.rows_of(student_ids)
+        features = np.empty((len(rows), len(names)), dtype=np.float64)
+        for j, name in enumerate(names):
+            features[:, j] = self.gather(name, rows)
+        return features
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the allocated columns (capacity, not just size)."""
+        return self._ids.nbytes + self._versions.nbytes + sum(column.nbytes for column in self._columns.values())
+
+    # --- Mutation ---
+
+    def upsert(self, record: Mapping) -> int:
+        """Insert or replace a student from a dict-like record. Returns its row."""
+        student_id = int(record["student_id"])
+        values = {name: _checked(name, record.get(name, self.defaults[name])) for name in STUDENT_COLUMNS}
+        row = self._index.get(student_id)
+        if row is None:
+            row = self._append(student_id, record.get("name", f"Student #{student_id}"))
+        elif "name" in record:
+            self._names[row] = record["name"]
+        for name, value in values.items():
+            self._columns[name][row] = value
+        self.version += 1
+        self._versions[row] = self.version
+        self._notify(student_id, row)
+        return row
+
+    def update(self, student_id: int, **metrics) -> int:
+        """Update some metrics of a student, creating it from defaults if needed."""
+        unknown = set(metrics) - set(STUDENT_COLUMNS) - {"name"}
+        if unknown:
+            raise KeyError(f"Unknown student metrics: {sorted(unknown)}")
+        row = self._index.get(student_id)
+        if row is None:
+            return self.upsert({"student_id": student_id, **self.defaults, **metrics})
+        values = {name: _checked(name, value) for name, value in metrics.items() if name != "name"}
+        if "name" in metrics:
+            self._names[row] = metrics["name"]
+        for name, value in values.items():
+            self._columns[name][row] = value
+        self.version += 1
+        self._versions[row] = self.version
+        self._notify(student_id, row)
+        return row
+
+    def add_listener(self, callback: Callable[[int, int], None]):
+        """Call ``callback(student_id, row)`` after every change of a student."""
+        self._listeners.append(callback)
+
+    def _notify(self, student_id: int, row: int):
+        for callback in self._listeners:
+            callback(student_id, row)
+
+    def _append(self, student_id: int, name: str) -> int:
+        row = self._size
+        if row == len(self._ids):
+            self._grow(2 * len(self._ids))
+        self._ids[row] = student_id
+        self._names.append(name)
+        self._index[student_id] = row
+        self._size += 1
+        return row
+
+    def _grow(self, capacity: int):
+        self._ids = np.resize(self._ids, capacity)
+        self._versions = np.resize(self._versions, capacity)
+        self._columns = {name: np.resize(column, capacity) for name, column in self._columns.items()}
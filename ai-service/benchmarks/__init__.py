@@ -0,0 +1,5 @@
+"""Performance benchmarks for the AI service.
+
+Run from the ``ai-service`` directory, e.g. ``python -m benchmarks.bench_predict_batch``.
+The HTTP benchmarks drive the FastAPI app in-process and need ``httpx``.
+"""
@@ -0,0 +1,86 @@
+"""JWT verification: verified requests/sec with the claims cache on and off.
+
+    python -m benchmarks.bench_auth --users 200 --requests 5000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+from jose import jwt
+
+from app.libs.auth import ClaimsCache, TokenVerifier
+from app.main import app, settings, token_verifier
+
+
+def make_tokens(n_users: int, ttl_seconds: float = 3600):
+    exp = int(time.time() + ttl_seconds)
+    return [
+        jwt.encode({"sub": str(user), "role": "student", "exp": exp}, settings.jwt_secret_key,
+                   algorithm=settings.jwt_algorithm)
+        for user in range(1, n_users + 1)
+    ]
+
+
+def verify_rate(verifier: TokenVerifier, tokens, n_calls: int) -> float:
+    calls = [tokens[i % len(tokens)] for i in range(n_calls)]
+    start = time.perf_counter()
+    for token in calls:
+        verifier.verify(token)
+    return n_calls / (time.perf_counter() - start)
+
+
+async def request_rate(tokens, n_requests: int, concurrency: int, rng) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = iter([rng.choice(tokens) for _ in range(n_requests)])
+
+        async def worker():
+            for token in queue:
+                response = await client.post("/predict", json={"student_id": 1, "module_code": "CS101"},
+                                             headers={"Authorization": f"Bearer {token}"})
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return n_requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="distinct tokens in rotation")
+    parser.add_argument("--calls", type=int, default=20_000, help="verify() calls per mode")
+    parser.add_argument("--requests", type=int, default=3_000, help="HTTP requests per mode")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    tokens = make_tokens(args.users)
+    print(f"{args.users} distinct tokens, {settings.jwt_algorithm}")
+
+    uncached = TokenVerifier(settings.jwt_secret_key, settings.jwt_algorithm)
+    cached = TokenVerifier(settings.jwt_secret_key, settings.jwt_algorithm, ClaimsCache())
+    print(f"  verify() cache off: {verify_rate(uncached, tokens, args.calls):10,.0f} tokens/s")
+    print(f"  verify() cache on : {verify_rate(cached, tokens, args.calls):10,.0f} tokens/s  "
+          f"hit rate {cached.cache.stats()['hit_rate']:.1%}")
+
+    settings.auth_enabled = True
+    baseline_cache = token_verifier.cache
+    try:
+        for label, cache in (("off", None), ("on", ClaimsCache())):
+            token_verifier.cache = cache
+            asyncio.run(request_rate(tokens, args.concurrency, args.concurrency, rng))
+            rate = asyncio.run(request_rate(tokens, args.requests, args.concurrency, rng))
+            print(f"  POST /predict, auth on, cache {label:<3}: {rate:8,.0f} verified req/s")
+        settings.auth_enabled = False
+        rate = asyncio.run(request_rate(tokens, args.requests, args.concurrency, rng))
+        print(f"  POST /predict, auth off          : {rate:8,.0f} req/s")
+        print(f"  {token_verifier.stats()}")
+    finally:
+        token_verifier.cache = baseline_cache
+        settings.auth_enabled = False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Micro-batched vs per-request model calls under concurrent load.
+
+Uses a stand-in model whose calls cost a fixed overhead plus a small per-row
+cost, which is the profile of tree-ensemble ``predict`` calls.
+
+    python -m benchmarks.bench_batcher --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import time
+
+from app.libs.batcher import MicroBatcher
+
+
+class FakeModel:
+    def __init__(self, call_overhead_ms: float, row_us: float):
+        self.call_overhead = call_overhead_ms / 1000.0
+        self.row_cost = row_us / 1e6
+
+    def predict_batch(self, rows):
+        # Busy-wait so the cost is CPU time, not sleep
+        end = time.perf_counter() + self.call_overhead + self.row_cost * len(rows)
+        while time.perf_counter() < end:
+            pass
+        return [0.5] * len(rows)
+
+
+async def drive(call, n_requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            await call(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return time.perf_counter() - start
+
+
+async def run(args):
+    model = FakeModel(args.call_overhead_ms, args.row_us)
+    loop = asyncio.get_running_loop()
+
+    async def unbatched(i):
+        return await loop.run_in_executor(None, model.predict_batch, [i])
+
+    batcher = MicroBatcher(model.predict_batch, max_batch_size=args.batch_size, max_delay_ms=args.delay_ms)
+
+    plain = await drive(unbatched, args.requests, args.concurrency)
+    batched = await drive(batcher.submit, args.requests, args.concurrency)
+    stats = batcher.stats()
+    await batcher.stop()
+
+    print(f"requests={args.requests} concurrency={args.concurrency} "
+          f"model: {args.call_overhead_ms} ms/call + {args.row_us} us/row")
+    print(f"  per-request calls  {args.requests / plain:>10,.0f} req/s")
+    print(f"  micro-batched      {args.requests / batched:>10,.0f} req/s  "
+          f"(avg batch {stats['avg_batch_size']:.1f}, {stats['batches']} batches)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--call-overhead-ms", type=float, default=0.5)
+    parser.add_argument("--row-us", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--delay-ms", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
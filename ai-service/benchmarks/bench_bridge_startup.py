@@ -0,0 +1,74 @@
+"""ApiBridge start-up time: cold CSV parse, warm columnar cache, lazy start.
+
+Each scenario runs in a fresh interpreter so import costs are included.
+
+    python -m benchmarks.bench_bridge_startup --rows 300000
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+SCENARIOS = {
+    # Previous behaviour: pandas imported at module load, CSV parsed in __init__
+    "eager read_csv (before)": "import pandas as pd; pd.read_csv(PATH)",
+    "cold (parse + write cache)": "from app.libs.api_bridge import ApiBridge; ApiBridge(PATH).columns",
+    "warm (mmap cache)": "from app.libs.api_bridge import ApiBridge; ApiBridge(PATH).columns",
+    "warm + DataFrame": "from app.libs.api_bridge import ApiBridge; ApiBridge(PATH).students",
+    "lazy (no data touched)": "from app.libs.api_bridge import ApiBridge; ApiBridge(PATH)",
+}
+
+
+def write_csv(path: str, n_rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        f.write("code_module,code_presentation,id_student,gender,region,highest_education,imd_band,"
+                "age_band,num_of_prev_attempts,studied_credits,disability,final_result,avg_score\n")
+        for i in range(n_rows):
+            f.write(
+                f"{rng.choice('ABCDEFG') * 3},2014J,{100000 + i},{rng.random():.6f},{rng.random():.6f},"
+                f"{rng.random():.6f},{rng.random():.6f},{rng.random():.6f},{rng.randint(0, 3)},"
+                f"{rng.random():.6f},{rng.randint(0, 1)},{rng.choice(['Pass', 'Fail', 'Withdrawn'])},"
+                f"{rng.uniform(30, 100):.2f}\n"
+            )
+
+
+def run_scenario(code: str, path: str) -> float:
+    script = (
+        "import time, warnings; warnings.simplefilter('ignore'); t = time.perf_counter()\n"
+        f"PATH = {path!r}\n"
+        "import contextlib, io\n"
+        f"with contextlib.redirect_stdout(io.StringIO()):\n    {code}\n"
+        "print(time.perf_counter() - t)"
+    )
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "student_info_normalized.csv")
+        write_csv(path, args.rows)
+        print(f"rows={args.rows} csv={os.path.getsize(path) / 2**20:.1f} MiB (best of {args.repeat})")
+        for name, code in SCENARIOS.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                if name.startswith("cold"):
+                    shutil.rmtree(os.path.join(tmp, ".cache"), ignore_errors=True)
+                best = min(best, run_scenario(code, path))
+            print(f"  {name:<28} {best * 1e3:8.0f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Batch quiz grading: vectorized core and the /grade_quiz endpoint end to end.
+
+    python -m benchmarks.bench_grading --students 10000 --questions 50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import numpy as np
+
+from app.grading import answer_key, answer_matrix, grade_matrix, grading_payload
+from app.libs import fast_json
+from app.main import app, quiz_bank
+from app.models import QuizGradingRequest
+
+
+def make_submissions(n_students: int, question_ids, seed: int = 42):
+    """Answers from a simple ability/difficulty model, 3% skipped."""
+    rng = np.random.default_rng(seed)
+    key = answer_key([quiz_bank.question(qid) for qid in question_ids])
+    ability = rng.normal(size=n_students)
+    difficulty = rng.normal(size=len(question_ids))
+    p_correct = 1 / (1 + np.exp(-(ability[:, None] - difficulty[None, :])))
+    wrong = (key + rng.integers(1, 4, size=p_correct.shape)) % 4
+    answers = np.where(rng.random(p_correct.shape) < p_correct, key, wrong)
+    answers[rng.random(p_correct.shape) < 0.03] = -1
+    return list(range(1, n_students + 1)), answers.tolist()
+
+
+def best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The bundled bank is small: cycle through its question ids
+    bank_ids = sorted({q["id"] for family in quiz_bank.families for q in quiz_bank.questions(family, "Medium")})
+    question_ids = [bank_ids[i % len(bank_ids)] for i in range(args.questions)]
+    student_ids, answers = make_submissions(args.students, question_ids)
+    body = fast_json.dumps({"question_ids": question_ids, "student_ids": student_ids, "answers": answers})
+
+    key = answer_key([quiz_bank.question(qid) for qid in question_ids])
+    matrix = answer_matrix(answers)
+    result = grade_matrix(matrix, key)
+    payload = grading_payload(student_ids, question_ids, result)
+    print(f"{args.students} submissions x {args.questions} questions, request {len(body) / 2**20:.1f} MiB "
+          f"(best of {args.repeat}, ms)")
+    stages = {
+        "validate request (pydantic)": lambda: QuizGradingRequest.model_validate_json(body),
+        "answer matrix (lists -> int16)": lambda: answer_matrix(answers),
+        "grade_matrix (scores + item stats)": lambda: grade_matrix(matrix, key),
+        "build payload": lambda: grading_payload(student_ids, question_ids, result),
+        "encode response": lambda: fast_json.dumps(payload),
+    }
+    for name, func in stages.items():
+        print(f"  {name:<36} {best_ms(func, args.repeat):8.2f}")
+
+    async def end_to_end():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = {"content-type": "application/json"}
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                response = await client.post("/grade_quiz", content=body, headers=headers)
+                timings.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+            return min(timings) * 1e3
+
+    print(f"  {'POST /grade_quiz end to end':<36} {asyncio.run(end_to_end()):8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Per-request cost of the metrics middleware and of the timing spans.
+
+    python -m benchmarks.bench_metrics --requests 200000
+"""
+import argparse
+import asyncio
+import time
+
+from app.libs.metrics import MetricsMiddleware, MetricsRegistry, timed, METRICS
+
+
+class _Route:
+    path = "/reco/{student_id}/{module_code}"
+
+
+async def bare_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def drive(app, n):
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await app({"type": "http", "method": "GET", "path": "/reco/1/CS101"}, receive, send)
+    return (time.perf_counter() - start) / n
+
+
+def per_call(func, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        func()
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.requests
+
+    bare = asyncio.run(drive(bare_app, n))
+    wrapped = asyncio.run(drive(MetricsMiddleware(bare_app, MetricsRegistry()), n))
+    print(f"requests={n}")
+    print(f"  bare ASGI app        {bare * 1e6:6.2f} us/request")
+    print(f"  + MetricsMiddleware  {wrapped * 1e6:6.2f} us/request  (overhead {(wrapped - bare) * 1e6:.2f} us)")
+
+    def lookup():
+        return 42
+
+    spanned = timed("bench.lookup")(lookup)
+    plain = per_call(lookup, n)
+    METRICS.spans_enabled = False
+    disabled = per_call(spanned, n)
+    METRICS.spans_enabled = True
+    enabled = per_call(spanned, n)
+    print(f"  @timed span disabled overhead {(disabled - plain) * 1e9:6.0f} ns/call")
+    print(f"  @timed span enabled  overhead {(enabled - plain) * 1e9:6.0f} ns/call")
+
+    registry = MetricsRegistry()
+    for i in range(1000):
+        registry.observe_request("GET", f"/route/{i % 20}", 200, i * 1e-4)
+    start = time.perf_counter()
+    body = registry.render_prometheus()
+    print(f"  /metrics render (20 routes) {(time.perf_counter() - start) * 1e3:.2f} ms, {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Per-pair throughput of ``/predict`` (one call per pair) vs ``/predict/batch``.
+
+Both endpoints are called in-process through an ASGI transport, so the numbers
+include routing, request parsing and response validation but no network.
+
+    python -m benchmarks.bench_predict_batch --pairs 1000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.data_service import DataService
+from app.main import app
+
+
+def make_pairs(n_pairs: int, seed: int = 42):
+    rng = random.Random(seed)
+    modules = list(DataService.get_all_modules())
+    # Mix of known students and fallback students
+    return [{"student_id": rng.randint(1, 500), "module_code": rng.choice(modules)} for _ in range(n_pairs)]
+
+
+async def run(n_pairs: int, batch_size: int, repeat: int):
+    pairs = make_pairs(n_pairs)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Correctness: batch must match the single-pair endpoint exactly
+        batch = (await client.post("/predict/batch", json={"pairs": pairs[:200]})).json()["predictions"]
+        for pair, expected in zip(pairs[:200], batch):
+            assert (await client.post("/predict", json=pair)).json() == expected
+
+        single_best = batch_best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for pair in pairs:
+                await client.post("/predict", json=pair)
+            single_best = min(single_best, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i in range(0, n_pairs, batch_size):
+                await client.post("/predict/batch", json={"pairs": pairs[i:i + batch_size]})
+            batch_best = min(batch_best, time.perf_counter() - start)
+
+    print(f"pairs={n_pairs} batch_size={batch_size} (best of {repeat})")
+    print(f"  /predict        {n_pairs / single_best:>12,.0f} pairs/s  {single_best / n_pairs * 1e6:8.1f} us/pair")
+    print(f"  /predict/batch  {n_pairs / batch_best:>12,.0f} pairs/s  {batch_best / n_pairs * 1e6:8.1f} us/pair")
+    print(f"  speedup         {single_best / batch_best:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.pairs, args.batch_size, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
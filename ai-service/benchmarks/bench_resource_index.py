@@ -0,0 +1,112 @@
+"""Resource catalog: memory and topic-match throughput, dicts vs the compact ResourceIndex.
+
+    python -m benchmarks.bench_resource_index --resources 100000 --topics 20 500
+"""
+import argparse
+import gc
+import heapq
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+
+from app.resource_index import DIFFICULTY_LEVELS, DIFFICULTY_WEIGHT, ResourceIndex, difficulty_fit
+
+
+def make_catalog(n_resources: int, n_topics: int = 500, seed: int = 42):
+    rng = random.Random(seed)
+    topics = [f"topic-{i}" for i in range(n_topics)]
+    return topics, [
+        {
+            "resource_id": f"res_{i}",
+            "title": f"Resource {i}",
+            "url": f"https://example.com/{i}",
+            "type": rng.choice(["video", "article", "exercise", "quiz"]),
+            "topics": rng.sample(topics, rng.randint(1, 4)),
+            "difficulty": rng.choice(list(DIFFICULTY_LEVELS)),
+        }
+        for i in range(n_resources)
+    ]
+
+
+def linear_scan(catalog, module_topics, limit):
+    module_topics = set(module_topics)
+    return [r for r in catalog if any(t in module_topics for t in r["topics"])][:limit]
+
+
+class PostingListIndex:
+    """The previous design: resource dicts plus a topic -> set of slots inverted index."""
+
+    def __init__(self, resources):
+        self.resources = list(resources)
+        self.postings = defaultdict(set)
+        for slot, resource in enumerate(self.resources):
+            for topic in resource["topics"]:
+                self.postings[topic].add(slot)
+
+    def top_k(self, topics, difficulty, limit):
+        overlap = defaultdict(int)
+        for topic in set(topics):
+            for slot in self.postings.get(topic, ()):
+                overlap[slot] += 1
+        fits = {d: DIFFICULTY_WEIGHT * difficulty_fit(d, difficulty) for d in DIFFICULTY_LEVELS}
+        scored = [(count + fits[self.resources[slot]["difficulty"]], -slot) for slot, count in overlap.items()]
+        return [self.resources[-neg_slot] for _, neg_slot in heapq.nlargest(limit, scored)]
+
+
+def traced_bytes(build):
+    """Memory still allocated by ``build()``'s result once its temporaries are freed."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def per_query_us(top_k, queries):
+    start = time.perf_counter()
+    for q in queries:
+        top_k(q, "intermediate", 5)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=int, default=100_000)
+    parser.add_argument("--topics", type=int, nargs="+", default=[20, 500], help="topic vocabulary sizes")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    for n_topics in args.topics:
+        topics, _ = make_catalog(0, n_topics)
+        (catalog, baseline), dict_bytes = traced_bytes(
+            lambda: (lambda c: (c, PostingListIndex(c)))(make_catalog(args.resources, n_topics)[1]))
+        _, index_bytes = traced_bytes(lambda: ResourceIndex(make_catalog(args.resources, n_topics)[1]))
+        start = time.perf_counter()
+        index = ResourceIndex(catalog)
+        build = time.perf_counter() - start
+
+        rng = random.Random(7)
+        queries = [rng.sample(topics, 3) for _ in range(args.queries)]
+        assert all([r["resource_id"] for r in baseline.top_k(q, "intermediate", 5)]
+                   == [r["resource_id"] for r in index.top_k(q, "intermediate", 5)] for q in queries[:20])
+        matches = sum(len(linear_scan(catalog, q, args.resources)) for q in queries[:20]) / 20
+
+        print(f"resources={args.resources} topics={n_topics} (~{matches:,.0f} matching resources per query)")
+        print(f"  memory: dicts + posting lists {dict_bytes / 2**20:7.1f} MiB "
+              f"({dict_bytes / args.resources:5.0f} B/resource)")
+        print(f"          ResourceIndex         {index_bytes / 2**20:7.1f} MiB "
+              f"({index_bytes / args.resources:5.0f} B/resource, arrays {index.nbytes / 2**20:.1f} MiB), "
+              f"build {build * 1e3:.0f} ms")
+        for name, top_k in (("linear scan (dicts)", lambda q, d, k: linear_scan(catalog, q, k)),
+                            ("posting lists (dicts)", baseline.top_k),
+                            ("bitset AND + popcount", index.top_k)):
+            us = per_query_us(top_k, queries)
+            print(f"  {name:<22} {us:9.1f} us/query  {1e6 / us:8,.0f} queries/s")
+        del catalog, baseline, index
+
+
+if __name__ == "__main__":
+    main()
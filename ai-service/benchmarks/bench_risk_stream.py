@@ -0,0 +1,105 @@
+"""Risk push fan-out: idle SSE subscriptions and the cost of publishing changes.
+
+    python -m benchmarks.bench_risk_stream --connections 5000 --pairs 4 --updates 20000
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from app.data_service import DataService
+from app.main import heuristic_prediction
+from app.risk_stream import RiskBroadcaster
+
+
+def add_students(n_students: int, rng):
+    store = DataService.get_student_store()
+    first_id = 1_000_000
+    for i in range(n_students):
+        store.upsert({"student_id": first_id + i, "avg_score": rng.uniform(40, 95),
+                      "study_hours_per_week": rng.randint(0, 12)})
+    return list(range(first_id, first_id + n_students))
+
+
+async def run(args):
+    rng = random.Random(42)
+    student_ids = add_students(args.students, rng)
+    modules = list(DataService.get_all_modules())
+    store = DataService.get_student_store()
+    broadcaster = RiskBroadcaster(heuristic_prediction, min_delta=args.min_delta,
+                                  max_subscriptions=args.connections, keepalive_seconds=args.keepalive)
+    received = [0] * args.connections
+
+    async def client(i, pairs):
+        async for chunk in broadcaster.stream(pairs):
+            received[i] += chunk.count(b"event: ")
+
+    print(f"{args.connections} connections x {args.pairs} pairs over {args.students} students, "
+          f"min_delta {args.min_delta}")
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    tasks = []
+    snapshot_events = 0
+    for i in range(args.connections):
+        pairs = {(rng.choice(student_ids), rng.choice(modules)) for _ in range(args.pairs)}
+        snapshot_events += len(pairs)
+        tasks.append(asyncio.create_task(client(i, pairs)))
+    while sum(received) < snapshot_events:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    per_connection = (tracemalloc.get_traced_memory()[0] - before) / args.connections
+    tracemalloc.stop()
+    print(f"  subscribe + snapshot      {elapsed / args.connections * 1e6:8.1f} us/connection")
+    print(f"  memory                    {per_connection / 1024:8.1f} KiB/connection")
+
+    cpu = time.process_time()
+    await asyncio.sleep(args.idle_seconds)
+    cpu = time.process_time() - cpu
+    print(f"  idle ({args.keepalive:g}s keep-alive)    {cpu / args.idle_seconds * 100:8.1f} % of one CPU")
+
+    baseline = sum(received)
+    start = time.perf_counter()
+    publish = 0.0
+    for _ in range(args.updates):
+        sid = rng.choice(student_ids)
+        store.update(sid, avg_score=min(100.0, max(0.0, store[sid]["avg_score"] + rng.gauss(0, 4))))
+        t0 = time.perf_counter()
+        broadcaster.on_student_updated(sid)
+        publish += time.perf_counter() - t0
+        if rng.random() < 0.01:
+            await asyncio.sleep(0)  # let clients drain now and then, like a busy server
+    while broadcaster.stats()["pending"]:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    stats = broadcaster.stats()
+    events = sum(received) - baseline
+    print(f"  {args.updates} student updates in {elapsed:.2f}s: publish {publish / args.updates * 1e6:.1f} us/update")
+    print(f"    published {stats['published']}, suppressed {stats['suppressed']}, "
+          f"events delivered {events}, conflated {stats['conflated']}")
+    polls = args.connections * args.pairs * elapsed / args.poll_seconds
+    print(f"    polling every {args.poll_seconds:g}s over the same window: {polls:,.0f} /predict calls")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    print(f"  after disconnect: {broadcaster.stats()['subscriptions']} subscriptions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--pairs", type=int, default=4, help="student/module pairs per connection")
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--min-delta", type=float, default=0.05)
+    parser.add_argument("--keepalive", type=float, default=15.0)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--poll-seconds", type=float, default=5.0, help="poll period the push replaces")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
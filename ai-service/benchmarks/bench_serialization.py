@@ -0,0 +1,99 @@
+"""Response serialization: validated response_model path vs pre-encoded bytes.
+
+    python -m benchmarks.bench_serialization --iterations 5000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.libs import fast_json
+from app.main import app, quiz_bank, response_body_cache, settings
+
+
+def route_field(path):
+    return next(route.response_field for route in app.routes if getattr(route, "path", None) == path)
+
+
+async def validated(field, content):
+    """What FastAPI does for a dict returned with a response_model."""
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def per_call(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func()
+    return (time.perf_counter() - start) / iterations
+
+
+async def end_to_end(client, method, url, body, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await client.request(method, url, json=body)
+    return (time.perf_counter() - start) / iterations
+
+
+async def run(iterations):
+    import httpx
+    from app.main import generate_smart_questions, _topic_recommendations
+
+    reco = {"student_id": 1, "module_code": "CS201", "recommendations": _topic_recommendations("CS201", 5, [])}
+    reco_field = route_field("/reco/{student_id}/{module_code}")
+    quiz_field = route_field("/generate_quiz")
+
+    async def reco_validated():
+        return await validated(reco_field, reco)
+
+    async def reco_encoded():
+        return fast_json.dumps(reco)
+
+    async def reco_cached():
+        fragment = response_body_cache.get(("CS201", 5, 0)) or b"[]"
+        return b'{"student_id":%d,"module_code":%s,"recommendations":%s}' % (1, fast_json.dumps("CS201"), fragment)
+
+    response_body_cache.put(("CS201", 5, 0), fast_json.dumps(reco["recommendations"]))
+
+    async def quiz_validated():
+        return await validated(quiz_field, {"module_code": "DEVOPS", "questions": generate_smart_questions("DEVOPS", "medium")})
+
+    async def quiz_encoded():
+        return quiz_bank.serialized_response("DEVOPS", "medium")
+
+    print(f"iterations={iterations} encoder={'orjson' if fast_json.orjson is not None else 'json'}")
+    print("serialization only (us/response):")
+    for name, func in [("reco   validated + json.dumps", reco_validated),
+                       ("reco   fast encoder, no validation", reco_encoded),
+                       ("reco   cached body fragment", reco_cached),
+                       ("quiz   validated + json.dumps", quiz_validated),
+                       ("quiz   pre-encoded questions", quiz_encoded)]:
+        print(f"  {name:<36} {await per_call(func, iterations) * 1e6:8.2f}")
+
+    print("end to end through the app (us/request):")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for strict in (True, False):
+            settings.strict_response_validation = strict
+            mode = "strict" if strict else "fast"
+            reco_us = await end_to_end(client, "GET", "/reco/1/CS201", None, iterations // 5) * 1e6
+            quiz_us = await end_to_end(client, "POST", "/generate_quiz",
+                                       {"module_code": "DEVOPS", "difficulty": "medium"}, iterations // 5) * 1e6
+            print(f"  {mode:<6} /reco {reco_us:8.1f}   /generate_quiz {quiz_us:8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--stdlib", action="store_true", help="use the json fallback even if orjson is installed")
+    args = parser.parse_args()
+    if args.stdlib:
+        fast_json.orjson = None
+    random.seed(0)
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
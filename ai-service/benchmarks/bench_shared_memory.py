@@ -0,0 +1,99 @@
+"""Memory per worker process: private pandas copy vs shared memory-mapped columns.
+
+Starts N worker processes at once. Each one loads the student CSV, reads
+every column, then reports its memory while all workers are alive (Linux
+/proc). PSS charges shared pages proportionally, so it is the per-worker
+share of the real footprint.
+
+    python -m benchmarks.bench_shared_memory --rows 300000 --workers 1 4 16
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_bridge_startup import write_csv
+
+WORKER = r"""
+import contextlib, io, json, sys, warnings
+warnings.simplefilter("ignore")
+PATH = sys.argv[1]
+with contextlib.redirect_stdout(io.StringIO()):
+    import pandas as pd
+    {load}
+# Read every value, as scoring would
+for name in frame.columns:
+    column = frame[name]
+    column.value_counts() if column.dtype.kind in "OU" or str(column.dtype) == "category" else column.sum()
+print("ready", flush=True)
+sys.stdin.readline()
+memory = {{}}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        key, _, value = line.partition(":")
+        if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty", "Shared_Clean"):
+            memory[key] = int(value.split()[0])
+print(json.dumps(memory), flush=True)
+"""
+
+MODES = {
+    "private copy (pd.read_csv)": "frame = pd.read_csv(PATH)",
+    "shared mmap (ApiBridge)": "from app.libs.api_bridge import ApiBridge; frame = ApiBridge(PATH).students",
+    "imports only (no data)": "from app.libs.api_bridge import ApiBridge; frame = pd.DataFrame()",
+}
+
+
+def run_workers(load: str, path: str, n_workers: int):
+    script = WORKER.format(load=load)
+    workers = [
+        subprocess.Popen([sys.executable, "-c", script, path], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                         text=True, cwd=os.getcwd())
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        line = worker.stdout.readline()
+        if line.strip() != "ready":
+            raise RuntimeError(f"worker failed: {line!r}")
+    reports = []
+    for worker in workers:
+        worker.stdin.write("\n")
+        worker.stdin.flush()
+        reports.append(json.loads(worker.stdout.readline()))
+    for worker in workers:
+        worker.stdin.close()
+        worker.wait()
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("Needs Linux /proc/<pid>/smaps_rollup")
+
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, "student_info_normalized.csv")
+        write_csv(path, args.rows)
+        # Build the columnar cache once, as the first worker would
+        run_workers(MODES["shared mmap (ApiBridge)"], path, 1)
+        print(f"rows={args.rows} csv={os.path.getsize(path) / 2**20:.1f} MiB (MiB per worker, mean)")
+        print(f"  {'mode':<28} {'workers':>7} {'RSS':>8} {'PSS':>8} {'private':>8} {'total PSS':>10}")
+        for name, load in MODES.items():
+            for n_workers in args.workers:
+                reports = run_workers(load, path, n_workers)
+                rss = sum(r["Rss"] for r in reports) / n_workers / 1024
+                pss = sum(r["Pss"] for r in reports) / n_workers / 1024
+                private = sum(r["Private_Clean"] + r["Private_Dirty"] for r in reports) / n_workers / 1024
+                print(f"  {name:<28} {n_workers:>7} {rss:8.1f} {pss:8.1f} {private:8.1f} {pss * n_workers:10.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Simulated predictions: global ``random.seed`` per call vs the stateless hash.
+
+    python -m benchmarks.bench_simulation --calls 200000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.libs.simulation import simulate_proba, simulate_proba_batch
+
+
+def reseed_global(student_id, module_code):
+    """Previous implementation of ApiBridge._simulate_prediction's draw."""
+    random.seed(int(student_id) + sum(ord(c) for c in module_code))
+    return random.uniform(0.45, 0.95)
+
+
+def rate(fn, ids, module_code):
+    start = time.perf_counter()
+    for sid in ids:
+        fn(sid, module_code)
+    return len(ids) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+    ids = list(range(args.calls))
+
+    print(f"calls={args.calls}")
+    print(f"  random.seed per call   {rate(reseed_global, ids, 'CS201'):>14,.0f} calls/s")
+    print(f"  stable hash (scalar)   {rate(simulate_proba, ids, 'CS201'):>14,.0f} calls/s")
+
+    id_array = np.arange(args.calls, dtype=np.int64)
+    start = time.perf_counter()
+    simulate_proba_batch(id_array, "CS201")
+    print(f"  stable hash (batch)    {args.calls / (time.perf_counter() - start):>14,.0f} students/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Single-flight coalescing: bursts of identical /reco requests, with and without it.
+
+    python -m benchmarks.bench_single_flight --students 50000 --burst 32 --hot 8
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks.bench_student_store import make_records
+
+
+def seed(n_students: int, n_feedback: int, rng):
+    from app.data_service import DataService
+
+    store = DataService.get_student_store()
+    for record in make_records(n_students, seed=7):
+        store.upsert(record)
+    from app import main
+
+    resource_ids = [r["resource_id"] for r in DataService.get_resources_for_module("CS101", 50)]
+    for _ in range(n_feedback):
+        main.recommender.record_feedback(rng.randint(1, n_students), rng.choice(resource_ids))
+    return main
+
+
+async def overhead(iterations):
+    """Cost of one uncontended ``SingleFlight.do`` around a trivial coroutine."""
+    from app.libs.single_flight import SingleFlight
+
+    flight = SingleFlight()
+
+    async def work():
+        return 1
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        await work()
+    direct = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(iterations):
+        await flight.do(i, work)
+    return (time.perf_counter() - start - direct) / iterations
+
+
+async def bursts(main, client, hot_ids, burst, rounds):
+    """Wall time per round of ``burst`` concurrent requests for each hot student."""
+    calls = 0
+    recommend = main.recommender.recommend
+
+    def counted(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return recommend(*args, **kwargs)
+
+    main.recommender.recommend = counted
+    timings = []
+    try:
+        for _ in range(rounds):
+            urls = [f"/reco/{sid}/CS101" for sid in hot_ids for _ in range(burst)]
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(client.get(url) for url in urls))
+            timings.append(time.perf_counter() - start)
+            assert all(r.status_code == 200 for r in responses)
+    finally:
+        main.recommender.recommend = recommend
+    return min(timings), calls / rounds
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    main = seed(args.students, args.feedback, rng)
+    flight = main.request_flight
+    hot_ids = rng.sample(range(1, args.students + 1), args.hot)
+
+    print(f"SingleFlight.do overhead: {await overhead(args.iterations) * 1e6:.2f} us/call")
+    print(f"{args.hot} hot students x {args.burst} concurrent identical /reco requests, best of {args.rounds}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        await bursts(main, client, hot_ids, 1, 1)
+        for label, enabled in (("off", None), ("on", flight)):
+            main.request_flight = enabled
+            elapsed, calls = await bursts(main, client, hot_ids, args.burst, args.rounds)
+            print(f"  single flight {label:<3}: {elapsed * 1e3:8.1f} ms/round  "
+                  f"{calls:5.0f} neighbour searches/round")
+    main.request_flight = flight
+    if flight is not None:
+        print(f"  {flight.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50_000)
+    parser.add_argument("--feedback", type=int, default=20_000, help="helpful-resource votes to seed")
+    parser.add_argument("--burst", type=int, default=32, help="concurrent identical requests per student")
+    parser.add_argument("--hot", type=int, default=8, help="distinct students per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
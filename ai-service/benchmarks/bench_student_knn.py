@@ -0,0 +1,93 @@
+"""Similar-student search: recall and latency of the inverted file vs exact search.
+
+    python -m benchmarks.bench_student_knn --students 500000 --probes 4 8 16
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.data_service import DEFAULT_STUDENT_METRICS
+from app.student_knn import StudentKnnIndex
+from app.student_store import StudentStore
+
+
+def make_records(n_students: int, first_id: int = 1, seed: int = 42):
+    """Students whose metrics are driven by two latent traits (ability, engagement)."""
+    rng = np.random.default_rng(seed)
+    ability = rng.normal(0, 1, n_students)
+    engagement = rng.normal(0, 1, n_students)
+    columns = {
+        "avg_score": np.clip(70 + 12 * ability + rng.normal(0, 5, n_students), 0, 100).round(1),
+        "attendance_rate": np.clip(0.85 + 0.08 * engagement + rng.normal(0, 0.03, n_students), 0, 1).round(2),
+        "assignment_completion": np.clip(0.85 + 0.06 * ability + 0.04 * engagement
+                                         + rng.normal(0, 0.03, n_students), 0, 1).round(2),
+        "forum_participation": np.clip(20 + 12 * engagement + rng.normal(0, 5, n_students), 0, None).astype(int),
+        "study_hours_per_week": np.clip(12 + 4 * engagement + 2 * ability
+                                        + rng.normal(0, 2, n_students), 0, None).astype(int),
+        "previous_modules_passed": np.clip(5 + 2 * ability + rng.normal(0, 1.5, n_students), 0, None).astype(int),
+    }
+    lists = {name: values.tolist() for name, values in columns.items()}
+    return [
+        {"student_id": first_id + i, **{name: values[i] for name, values in lists.items()}}
+        for i in range(n_students)
+    ]
+
+
+def percentile_us(samples, q):
+    return float(np.percentile(samples, q)) * 1e6
+
+
+def run_queries(index, query_ids, k, exact):
+    results, latencies = [], []
+    for sid in query_ids:
+        start = time.perf_counter()
+        results.append(index.query(sid, k, exact=exact))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def recall(truth, approx):
+    return float(np.mean([len({s for s, _ in t} & {s for s, _ in a}) / len(t) for t, a in zip(truth, approx)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--inserts", type=int, default=20_000)
+    args = parser.parse_args()
+
+    store = StudentStore.from_records(make_records(args.students), defaults=DEFAULT_STUDENT_METRICS)
+    start = time.perf_counter()
+    index = StudentKnnIndex(store, exact_max_students=0)
+    print(f"students={args.students} build {time.perf_counter() - start:.2f} s "
+          f"({len(index._centroids)} cells)")
+
+    query_ids = np.random.default_rng(7).integers(1, args.students + 1, args.queries).tolist()
+    truth, latencies = run_queries(index, query_ids, args.k, exact=True)
+    print(f"  exact          p50 {percentile_us(latencies, 50):8.0f} us  p99 {percentile_us(latencies, 99):8.0f} us")
+    for n_probe in args.probes:
+        index.n_probe = n_probe
+        approx, latencies = run_queries(index, query_ids, args.k, exact=False)
+        print(f"  ivf probe={n_probe:<3}  p50 {percentile_us(latencies, 50):8.0f} us  "
+              f"p99 {percentile_us(latencies, 99):8.0f} us  recall@{args.k} {recall(truth, approx):.3f}")
+
+    # Incremental inserts: new students are searchable at once and merged in batches
+    index.n_probe = 8
+    new_records = make_records(args.inserts, first_id=args.students + 1, seed=43)
+    start = time.perf_counter()
+    for record in new_records:
+        store.upsert(record)
+    per_insert = (time.perf_counter() - start) / args.inserts
+    query_ids = [r["student_id"] for r in new_records[:args.queries]]
+    truth, _ = run_queries(index, query_ids, args.k, exact=True)
+    approx, latencies = run_queries(index, query_ids, args.k, exact=False)
+    print(f"  +{args.inserts} inserts  {per_insert * 1e6:6.1f} us/insert (store + index), "
+          f"new-student recall@{args.k} {recall(truth, approx):.3f}, p50 {percentile_us(latencies, 50):.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Memory per 100k students: per-student dicts vs the columnar StudentStore.
+
+    python -m benchmarks.bench_student_store --students 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.data_service import DEFAULT_STUDENT_METRICS
+from app.student_store import StudentStore
+
+
+def make_records(n_students: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        {
+            "student_id": sid,
+            "name": f"Student {sid}",
+            "avg_score": round(rng.uniform(40, 100), 1),
+            "attendance_rate": round(rng.random(), 2),
+            "assignment_completion": round(rng.random(), 2),
+            "forum_participation": rng.randint(0, 100),
+            "study_hours_per_week": rng.randint(0, 40),
+            "previous_modules_passed": rng.randint(0, 12),
+        }
+        for sid in range(1, n_students + 1)
+    ]
+
+
+def measure(build):
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.students
+
+    dict_layout, dict_bytes = measure(lambda: {r["student_id"]: r for r in make_records(n)})
+    records = make_records(n)
+    store, store_bytes = measure(lambda: StudentStore.from_records(records, defaults=DEFAULT_STUDENT_METRICS))
+
+    print(f"students={n}")
+    print(f"  dict layout     {dict_bytes / 2**20:8.1f} MiB")
+    print(f"  columnar store  {store_bytes / 2**20:8.1f} MiB  (numeric columns {store.nbytes / 2**20:.1f} MiB)")
+
+    # Cohort mean of avg_score: walking dicts vs one column reduction
+    start = time.perf_counter()
+    for _ in range(10):
+        sum(s["avg_score"] for s in dict_layout.values()) / n
+    dict_time = (time.perf_counter() - start) / 10
+    start = time.perf_counter()
+    for _ in range(10):
+        store.column("avg_score").mean()
+    store_time = (time.perf_counter() - start) / 10
+    print(f"  cohort mean     dicts {dict_time * 1e3:.2f} ms  column {store_time * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
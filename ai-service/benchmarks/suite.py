@@ -0,0 +1,249 @@
+"""Reproducible micro-benchmark and in-process load suite with baseline comparison.
+
+    python -m benchmarks.suite --students 10000 --resources 2000 --output bench.json
+    python -m benchmarks.suite --output bench.json --baseline bench-main.json --threshold 0.15
+
+The data service is seeded with synthetic students and resources (fixed seed)
+before the app is imported, so the app's indexes are built over them. Every
+result has a ``value`` where lower is better: best-round microseconds per call
+for micro-benchmarks, p95 milliseconds for load scenarios. With ``--baseline``
+results whose value grew by more than ``--threshold`` are reported as
+regressions and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.bench_resource_index import make_catalog
+from benchmarks.bench_student_store import make_records
+
+
+def seed_data(n_students: int, n_resources: int, seed: int):
+    """Load synthetic students and resources into the data service."""
+    from app.data_service import DataService
+
+    store = DataService.get_student_store()
+    for record in make_records(n_students, seed=seed):
+        store.upsert(record)
+    _, catalog = make_catalog(n_resources, seed=seed)
+    for resource in catalog:
+        DataService.add_resource(resource)
+
+
+# --- Micro-benchmarks ---
+
+def micro(func, arguments, number: int, repeat: int):
+    """Per-call timings of ``func(*args)`` cycling through ``arguments``."""
+    calls = [arguments[i % len(arguments)] for i in range(number)]
+    func(*calls[0])
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for args in calls:
+            func(*args)
+        timings.append((time.perf_counter() - start) / number * 1e6)
+    return {
+        "value": min(timings),
+        "unit": "us/call",
+        "median_us": statistics.median(timings),
+        "min_us": min(timings),
+        "calls": number * repeat,
+    }
+
+
+def run_micro(args, rng):
+    from app.data_service import DataService
+    from app.libs.api_bridge import ApiBridge
+    from app.main import generate_smart_questions
+
+    modules = list(DataService.get_all_modules()) + ["DEVOPS101", "JAVA200", "UNKNOWN1"]
+    student_ids = [(rng.randint(1, args.students),) for _ in range(1000)]
+    module_args = [(rng.choice(modules),) for _ in range(1000)]
+    quiz_args = [(rng.choice(modules), rng.choice(["easy", "medium", "hard"])) for _ in range(1000)]
+    pairs = [(sid, code) for (sid,), (code,) in zip(student_ids, module_args)]
+    bridge = ApiBridge()
+    format_args = [(sid, code, rng.random(), "Simulation") for sid, code in pairs]
+
+    cases = {
+        "micro.data_service.get_student": (DataService.get_student, student_ids),
+        "micro.data_service.get_resources_for_module": (DataService.get_resources_for_module, module_args),
+        "micro.generate_smart_questions": (generate_smart_questions, quiz_args),
+        "micro.api_bridge.simulate_prediction": (bridge._simulate_prediction, pairs),
+        "micro.api_bridge.format_result": (bridge._format_result, format_args),
+    }
+    return {name: micro(func, arguments, args.number, args.repeat) for name, (func, arguments) in cases.items()}
+
+
+# --- Load scenarios ---
+
+async def drive(client, requests, concurrency: int):
+    """Send ``requests`` (method, url, json) with ``concurrency`` workers; latencies in seconds."""
+    latencies = []
+    errors = 0
+    queue = iter(requests)
+
+    async def worker():
+        nonlocal errors
+        for method, url, body in queue:
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def load_result(latencies, errors, elapsed):
+    ms = np.array(latencies) * 1e3
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]).tolist()
+    return {
+        "value": p95,
+        "unit": "p95 ms",
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "throughput_rps": len(latencies) / elapsed,
+        "requests": len(latencies),
+        "errors": errors,
+    }
+
+
+def run_load(args, rng):
+    import httpx
+    from app.data_service import DataService
+    from app.main import app
+
+    modules = list(DataService.get_all_modules())
+
+    def predict():
+        return "POST", "/predict", {"student_id": rng.randint(1, args.students), "module_code": rng.choice(modules)}
+
+    def reco():
+        return "GET", f"/reco/{rng.randint(1, args.students)}/{rng.choice(modules)}", None
+
+    def quiz():
+        return "POST", "/generate_quiz", {"module_code": rng.choice(modules + ["DEVOPS101", "JAVA200"]),
+                                          "difficulty": rng.choice(["easy", "medium", "hard"])}
+
+    scenarios = {
+        "load.predict": [predict],
+        "load.reco": [reco],
+        "load.generate_quiz": [quiz],
+        "load.mixed": [predict, reco, quiz],
+    }
+
+    async def run():
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, makers in scenarios.items():
+                requests = [rng.choice(makers)() for _ in range(args.requests)]
+                await drive(client, requests[:args.concurrency], args.concurrency)
+                results[name] = load_result(*await drive(client, requests, args.concurrency))
+        return results
+
+    return asyncio.run(run())
+
+
+# --- Reporting ---
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold: float):
+    """``(name, baseline value, value, relative change, regressed)`` rows."""
+    rows = []
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            rows.append((name, None, result["value"], None, False))
+            continue
+        change = result["value"] / reference["value"] - 1.0 if reference["value"] else 0.0
+        rows.append((name, reference["value"], result["value"], change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--resources", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--number", type=int, default=2_000, help="calls per micro-benchmark round")
+    parser.add_argument("--repeat", type=int, default=5, help="micro-benchmark rounds")
+    parser.add_argument("--requests", type=int, default=2_000, help="requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    seed_data(args.students, args.resources, args.seed)
+
+    results = {}
+    if not args.skip_micro:
+        results.update(run_micro(args, rng))
+    if not args.skip_load:
+        results.update(run_load(args, rng))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        extra = ""
+        if "throughput_rps" in result:
+            extra = (f"  p50 {result['p50_ms']:.2f}  p99 {result['p99_ms']:.2f} ms  "
+                     f"{result['throughput_rps']:.0f} req/s  errors {result['errors']}")
+        print(f"{name:<46} {result['value']:10.2f} {result['unit']}{extra}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"Baseline not found: {args.baseline}")
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        print(f"\nvs {args.baseline} (threshold +{args.threshold:.0%})")
+        for name, reference, value, change, regressed in rows:
+            if reference is None:
+                print(f"  {name:<46} new")
+            else:
+                print(f"  {name:<46} {reference:10.2f} -> {value:10.2f}  {change:+7.1%}"
+                      f"{'  REGRESSION' if regressed else ''}")
+        if any(row[4] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()